@@ -2,9 +2,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import platform
-import re
 from matplotlib import cm
 
+from 시간대_누적 import HourPrefix
+from 인코딩감지 import read_csv_auto
+
 # ==============================
 # 0) 한글 폰트 설정
 # ==============================
@@ -20,10 +22,7 @@ plt.rcParams["axes.unicode_minus"] = False
 # 1) 데이터 로드
 # ==============================
 file_path = "/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/시간대별_월평균_평일휴일_역별_승하차_통합(반올림_행합계포함).csv"
-try:
-    df = pd.read_csv(file_path, encoding="utf-8")
-except UnicodeDecodeError:
-    df = pd.read_csv(file_path, encoding="cp949")
+df = read_csv_auto(file_path)
 
 # (선택) 분석 기간 제한
 # df = df[(df["월"] >= "2021-07") & (df["월"] <= "2023-12")].copy()
@@ -36,54 +35,23 @@ if "평일휴일" not in df.columns:
 df = df[df["평일휴일"].astype(str).str.strip() == "평일"].copy()
 
 # ==============================
-# 3) 시간대 컬럼 자동 인식
-# ==============================
-time_cols = [c for c in df.columns if "시간대" in c]
-
-# "HH-HH시간대" 형태만 매칭 (예: "10-11시간대")
-rgx = re.compile(r"^(\d{2})-(\d{2})시간대$")
-
-def parse_bin(col: str):
-    m = rgx.match(col)
-    if not m:
-        return None
-    s, e = int(m.group(1)), int(m.group(2))
-    return s, e
-
-# ==============================
-# 4) 10~17시 구간 컬럼 선별 (10-11, ..., 16-17)
+# 3) 10~17시 구간 컬럼 선별 (10-11, ..., 16-17)
 # ==============================
 WIN_START = 10
 WIN_END   = 17  # 마지막 bin은 16-17
 
-time_cols_10_17 = []
-for c in time_cols:
-    pr = parse_bin(c)
-    if pr is None:
-        continue
-    s, e = pr
-    if s >= WIN_START and e <= WIN_END:
-        time_cols_10_17.append(c)
-
-# 폴백(표준 이름 세트)
-fallback_10_17 = [f"{h:02d}-{h+1:02d}시간대" for h in range(10, 17)]
-if not time_cols_10_17:
-    time_cols_10_17 = [c for c in fallback_10_17 if c in df.columns]
-
-if not time_cols_10_17:
-    raise ValueError("10~17시 구간에 해당하는 시간대 컬럼을 찾지 못했습니다. 컬럼명을 확인해 주세요.")
-
-# "그 외" 시간대 = 전체 시간대 - (10~17시)
-other_time_cols = [c for c in time_cols if c not in time_cols_10_17]
+# 시간대 누적합 색인 (시간대 컬럼은 헤더에서 자동 인식, 없으면 ValueError)
+prefix = HourPrefix.from_table(df)
 
 # ==============================
-# 5) 10~17시 합계 & 그 외 합계 (월평균 하루치 기준)
+# 4) 10~17시 합계 & 그 외 합계 (월평균 하루치 기준)
+#    "그 외" = 하루 전체 - (10~17시)
 # ==============================
-df["합계_10to17"] = df[time_cols_10_17].sum(axis=1)
-df["합계_OTHER"]  = df[other_time_cols].sum(axis=1)
+df["합계_10to17"] = prefix.window(WIN_START, WIN_END)
+df["합계_OTHER"]  = prefix.total() - df["합계_10to17"]
 
 # ==============================
-# 6) 연도 생성 및 연도별 비율(100% 정규화)
+# 5) 연도 생성 및 연도별 비율(100% 정규화)
 # ==============================
 if "월" not in df.columns:
     raise ValueError("'월' 컬럼이 없습니다. 예: 2022-03 형식")
@@ -105,7 +73,7 @@ vals_10_17 = yearly_ratio["합계_10to17"].reindex(years, fill_value=0.0)
 vals_other = yearly_ratio["합계_OTHER"].reindex(years, fill_value=0.0)
 
 # ==============================
-# 7) 시각화: 연도별 '좌우 나란히' 막대(그룹드 바)
+# 6) 시각화: 연도별 '좌우 나란히' 막대(그룹드 바)
 # ==============================
 x = np.arange(len(years))
 width = 0.38
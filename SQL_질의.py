@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+DuckDB SQL 질의 계층 (디스크 파일 위에 뷰만 만들고, 결과는 pandas DataFrame)
+- 파일을 미리 메모리에 올리지 않고 뷰로 등록 → 질의할 때 필요한 컬럼/파티션만 읽음
+  · ridership  : 노인 승하차 통합 테이블 (hive 파티션 Parquet, 연도/월/승하차구분 조건은 파티션 프루닝)
+  · monthly    : 시간대별 월평균 요약 CSV
+  · od         : OD 수집 결과 (CSV/Parquet 여러 파일 → 컬럼 이름 기준으로 합침)
+  · stations   : 역 위경도 CSV
+  · facilities : 문화체육 시설 CSV
+- DuckDB가 병렬로 실행하고, 메모리가 모자라면 temp_directory로 내려 씀 (메모리보다 큰 집계 가능)
+- utf-8이 아닌 CSV(cp949 등)는 DuckDB가 바로 읽지 못하므로 read_csv_auto로 읽어 DataFrame을 등록
+  (역 좌표 / 시설처럼 작은 표만 해당)
+  예) with open_sql() as q:
+          q.query('''SELECT 역명, SUM(일일합계) AS 합계 FROM ridership
+                     WHERE 연도 = 2023 AND 승하차구분 = '하차' GROUP BY 역명 ORDER BY 합계 DESC LIMIT 10''')
+          q.query("SELECT * FROM monthly WHERE 월 = ?", ["2023-07"])
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from 인코딩감지 import detect_encoding, read_csv_auto
+
+# ===== 기본 경로 (노인_지하철파일.py / 거리 관련.py 와 같은 위치) =====
+OUT_ROOT = Path("/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력")
+DEFAULT_SOURCES = {
+    "ridership": OUT_ROOT / "노인승하차_parquet",
+    "monthly": OUT_ROOT / "시간대별_월평균_평일휴일_역별_승하차_통합(반올림_행합계포함).csv",
+    "od": OUT_ROOT.parent / "노인_지하철_*.csv",
+    "stations": Path("서울교통공사 1~9호선과 위경도 자치구 포함.csv"),
+    "facilities": Path("서울 문화체육 관광분야전시관 시설 데이터.csv"),
+}
+
+
+def _literal(path) -> str:
+    """경로 → SQL 문자열 리터럴 (뷰 정의에는 바인딩 파라미터를 쓸 수 없음)"""
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+class RidershipSQL:
+    """DuckDB 연결 하나 + 등록된 뷰 목록"""
+
+    def __init__(self, database: str = ":memory:", threads: int | None = None,
+                 memory_limit: str | None = None, temp_dir=None):
+        import duckdb
+
+        config = {}
+        if threads is not None:
+            config["threads"] = int(threads)
+        if memory_limit is not None:
+            config["memory_limit"] = memory_limit
+        if temp_dir is not None:
+            config["temp_directory"] = str(temp_dir)
+        self.con = duckdb.connect(database, config=config)
+        self.sources = {}
+
+    # ---- 뷰 등록 ----
+    def register_parquet(self, name: str, root):
+        """Parquet 파일 또는 hive 파티션 폴더 → 뷰 (파티션 컬럼은 WHERE 조건으로 폴더째 건너뜀)"""
+        root = Path(root)
+        if root.is_dir():
+            if not any(root.rglob("*.parquet")):
+                raise FileNotFoundError(f"Parquet 파일이 없습니다: {root}")
+            src = f"read_parquet({_literal(root / '**' / '*.parquet')}, hive_partitioning = true, union_by_name = true)"
+        elif root.exists():
+            src = f"read_parquet({_literal(root)})"
+        else:
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {root}")
+        self.con.execute(f'CREATE OR REPLACE VIEW "{name}" AS SELECT * FROM {src}')
+        self.sources[name] = root
+        return self
+
+    def register_csv(self, name: str, path):
+        """
+        CSV 한 개 또는 glob 패턴(여러 파일, 컬럼 이름 기준으로 합침) → 뷰
+        - utf-8(BOM 포함)이면 DuckDB가 파일을 직접 읽음, 아니면 read_csv_auto 결과를 등록
+        """
+        path = Path(path)
+        files = sorted(path.parent.glob(path.name)) if any(ch in path.name for ch in "*?[") else [path]
+        files = [f for f in files if f.exists()]
+        if not files:
+            raise FileNotFoundError(f"CSV 파일을 찾을 수 없습니다: {path}")
+
+        if all(detect_encoding(f) in ("utf-8", "utf-8-sig") for f in files):
+            listed = "[" + ", ".join(_literal(f) for f in files) + "]"
+            self.con.execute(f'CREATE OR REPLACE VIEW "{name}" AS SELECT * FROM '
+                             f"read_csv({listed}, header = true, union_by_name = true)")
+        else:
+            frame = pd.concat([read_csv_auto(f) for f in files], ignore_index=True)
+            frame.columns = [str(c).strip() for c in frame.columns]
+            self.con.register(name, frame)
+        self.sources[name] = path
+        return self
+
+    def register_frame(self, name: str, df: pd.DataFrame):
+        """이미 읽어 둔 DataFrame → 뷰 (복사 없이 그대로 조회)"""
+        self.con.register(name, df)
+        self.sources[name] = "DataFrame"
+        return self
+
+    def register(self, name: str, path):
+        """확장자/폴더로 판단해서 등록 (폴더·.parquet → Parquet, 나머지 → CSV)"""
+        path = Path(path)
+        if path.is_dir() or path.suffix == ".parquet":
+            return self.register_parquet(name, path)
+        return self.register_csv(name, path)
+
+    # ---- 질의 ----
+    def query(self, sql: str, params=None) -> pd.DataFrame:
+        """SQL 실행 → pandas DataFrame (params: ? 자리에 들어갈 값 목록)"""
+        return self.con.execute(sql, params or []).df()
+
+    def plan(self, sql: str) -> str:
+        """실행 계획 (필터/컬럼이 스캔 단계로 내려갔는지 확인용)"""
+        return "\n".join(str(row[-1]) for row in self.con.execute(f"EXPLAIN {sql}").fetchall())
+
+    def views(self) -> list[str]:
+        return sorted(self.sources)
+
+    def columns(self, name: str) -> pd.DataFrame:
+        """뷰의 컬럼 이름 / 타입"""
+        return self.query(f'DESCRIBE "{name}"')[["column_name", "column_type"]]
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sql(sources=None, skip_missing: bool = True, **kwargs) -> RidershipSQL:
+    """
+    기본 경로(DEFAULT_SOURCES)의 표를 모두 뷰로 등록한 연결
+    - sources: {뷰 이름: 경로} 로 일부만 바꾸거나 추가
+    - skip_missing=True면 없는 파일은 건너뛰고 알림만 출력
+    - 나머지 인자(threads, memory_limit, temp_dir …)는 RidershipSQL로 전달
+    """
+    q = RidershipSQL(**kwargs)
+    for name, path in {**DEFAULT_SOURCES, **(sources or {})}.items():
+        try:
+            q.register(name, path)
+        except FileNotFoundError as e:
+            if not skip_missing:
+                q.close()
+                raise
+            print(f"[건너뜀] {name}: {e}")
+    return q
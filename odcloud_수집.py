@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+공공데이터포털(odcloud) 페이지 API 공통 수집기
+- 1페이지에서 totalCount(조건 검색이면 matchCount)를 읽어 전체 페이지 수 계산
+- 나머지 페이지는 스레드 풀로 동시에 요청 (동시 요청 수 제한)
+- requests.Session + 커넥션 풀(keep-alive) 재사용 → 페이지마다 새 연결을 맺지 않음
+- 일시 오류(연결 끊김, 429, 5xx)는 지수 백오프로 재시도
+- base url / session을 인자로 받으므로 odcloud 페이징 규칙을 흉내 낸 로컬 HTTP 서버로도 검증 가능
+- (선택) PageCache: 받은 페이지를 (UDDI, page, perPage) 단위로 gzip 저장
+  · 중간에 끊긴 수집은 이미 받은 페이지를 디스크에서 읽고 나머지만 요청 (이어받기)
+  · 끝까지 받은 스냅샷을 다시 실행하면 네트워크 요청 0회
+  · 캐시 전체 크기가 예산을 넘으면 오래 안 쓴 스냅샷부터 삭제
+- (선택) 스트리밍 저장: 페이지마다 타입이 정해진 pyarrow 배치로 바꿔 Parquet/CSV에 바로 이어 씀
+  · 페이지마다 타입을 추론해 앞 페이지와 합침 (값을 자르거나 NaN으로 바꾸지 않음), 파일 저장은 기본 문자열
+  · types로 컬럼별 타입을 주면 문자열로 받은 뒤 그 컬럼만 변환 (예: 시간대/승객수 → int64)
+  → 전체 레코드를 dict 리스트로 모으지 않으므로 메모리는 페이지 몇 개 분량만 사용
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 페이지 캐시 기본 위치 / 용량 (이 파일 옆)
+CACHE_DIR = Path(__file__).with_name("odcloud_캐시")
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    """동시 요청 수만큼 커넥션을 유지하는 세션"""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def get_page(session, url: str, params: dict, retries: int = 4, backoff: float = 0.5,
+             timeout: float = 30) -> dict:
+    """페이지 1개 요청 → JSON payload (일시 오류는 재시도)"""
+    for attempt in range(retries + 1):
+        try:
+            resp = session.get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if resp.status_code == 200:
+                try:
+                    return resp.json()
+                except Exception:
+                    raise RuntimeError("JSON 파싱 실패:\n" + resp.text[:500])
+            # 방어적 체크: 재시도 대상이 아니거나 재시도를 다 썼으면 내용 출력
+            if resp.status_code not in RETRY_STATUS or attempt == retries:
+                raise RuntimeError(f"[HTTP {resp.status_code}] {resp.text[:500]}")
+        time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.5))
+
+
+class PageCache:
+    """
+    페이지 단위 디스크 캐시
+    root/{스냅샷키}/p{perPage}/{page:06d}.json.gz  +  root/{스냅샷키}/p{perPage}/_meta.json
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def snapshot_key(url: str, extra_params: dict | None = None) -> str:
+        """URL 마지막 경로(uddi:...) + (조건 검색이면) 조건 해시"""
+        key = re.sub(r'[\\/:*?"<>|]', "_", url.rstrip("/").rsplit("/", 1)[-1])
+        if extra_params:
+            cond = json.dumps(extra_params, sort_keys=True, ensure_ascii=False)
+            key += "_" + hashlib.sha1(cond.encode("utf-8")).hexdigest()[:10]
+        return key
+
+    def _dir(self, key: str, per_page: int) -> Path:
+        return self.root / key / f"p{per_page}"
+
+    def get(self, key: str, page: int, per_page: int) -> dict | None:
+        path = self._dir(key, per_page) / f"{page:06d}.json.gz"
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, EOFError, OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, page: int, per_page: int, payload: dict):
+        d = self._dir(key, per_page)
+        d.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp_")
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            f.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        os.replace(tmp, d / f"{page:06d}.json.gz")
+
+    def touch(self, key: str, per_page: int, **meta):
+        """스냅샷 사용 시각(및 완료 여부 등) 기록 → 삭제 순서 판단용"""
+        d = self._dir(key, per_page)
+        d.mkdir(parents=True, exist_ok=True)
+        path = d / "_meta.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                old = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            old = {}
+        old.update(meta, last_used=time.time())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(old, f, ensure_ascii=False)
+
+    def evict(self, keep: tuple | None = None):
+        """전체 크기가 max_bytes를 넘으면 last_used가 오래된 스냅샷부터 삭제 (keep=(키, perPage)는 제외)"""
+        if not self.root.exists():
+            return
+        snaps = []
+        for d in self.root.glob("*/p*"):
+            size = sum(f.stat().st_size for f in d.iterdir() if f.is_file())
+            try:
+                with open(d / "_meta.json", "r", encoding="utf-8") as f:
+                    used = json.load(f).get("last_used", 0)
+            except (FileNotFoundError, json.JSONDecodeError):
+                used = 0
+            snaps.append((used, size, d))
+
+        keep_dir = self._dir(*keep) if keep is not None else None
+        total = sum(s for _, s, _ in snaps)
+        for used, size, d in sorted(snaps, key=lambda t: t[0]):
+            if total <= self.max_bytes:
+                break
+            if d == keep_dir:
+                continue
+            shutil.rmtree(d, ignore_errors=True)
+            total -= size
+
+
+def iter_pages(url: str, service_key: str, per_page: int = 1000, max_pages: int | None = None,
+               workers: int = 8, session=None, extra_params: dict | None = None,
+               cache: PageCache | None = None, **retry_kw):
+    """
+    (page, data) 를 페이지 순서대로 하나씩 반환
+    - 동시에 진행 중인 요청은 최대 workers × 2 페이지 → 메모리도 그만큼으로 제한
+    - cache가 있으면 디스크에 있는 페이지는 요청하지 않음
+    """
+    own_session = session is None
+    session = session or make_session(workers)
+    key = PageCache.snapshot_key(url, extra_params) if cache is not None else None
+
+    def _params(page):
+        p = {"serviceKey": service_key, "page": page, "perPage": per_page}
+        if extra_params:
+            p.update(extra_params)   # 예) {"cond[역명::EQ]": "서울역"}
+        return p
+
+    def _get(page):
+        if cache is not None:
+            hit = cache.get(key, page, per_page)
+            if hit is not None:
+                return hit
+        payload = get_page(session, url, _params(page), **retry_kw)
+        if cache is not None and payload.get("data"):
+            cache.put(key, page, per_page, payload)
+        return payload
+
+    try:
+        for page, data in _iter_pages(_get, per_page, max_pages, workers):
+            yield page, data
+        if cache is not None:
+            cache.touch(key, per_page, url=url)
+            cache.evict(keep=(key, per_page))
+    finally:
+        if own_session:
+            session.close()
+
+
+def _iter_pages(_get, per_page: int, max_pages: int | None, workers: int):
+    """_get(page) → payload 로 페이지 순회 (1페이지 → 전체 페이지 수 계산 → 나머지 병렬)"""
+    first = _get(1)
+    data = first.get("data", [])
+    if not data or first.get("currentCount", 0) == 0:
+        return
+    yield 1, data
+
+    total = first.get("matchCount") or first.get("totalCount")
+    if total is None:
+        # totalCount를 안 주는 API면 빈 페이지가 나올 때까지 순차 조회
+        page = 2
+        while max_pages is None or page <= max_pages:
+            payload = _get(page)
+            data = payload.get("data", [])
+            if not data or payload.get("currentCount", 0) == 0:
+                return
+            yield page, data
+            page += 1
+        return
+
+    n_pages = math.ceil(int(total) / per_page)
+    if max_pages is not None:
+        n_pages = min(n_pages, max_pages)
+    if n_pages <= 1:
+        return
+
+    window = max(1, workers) * 2
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {}
+        next_page = 2
+        for page in range(2, n_pages + 1):
+            while next_page <= n_pages and len(pending) < window:
+                pending[next_page] = pool.submit(_get, next_page)
+                next_page += 1
+            yield page, pending.pop(page).result().get("data", [])
+
+
+def fetch_rows(url: str, service_key: str, per_page: int = 1000, max_pages: int | None = None,
+               workers: int = 8, **kw) -> list[dict]:
+    """전체 페이지의 레코드를 페이지 순서대로 이어 붙인 리스트"""
+    rows = []
+    for _, data in iter_pages(url, service_key, per_page, max_pages, workers, **kw):
+        rows.extend(data)
+    return rows
+
+
+def _as_strings(data: list[dict]) -> tuple[pa.Schema, list[dict]]:
+    """레코드 값을 모두 문자열로 (결측은 그대로) → (필드 순서대로 문자열 스키마, 레코드)"""
+    names = list(dict.fromkeys(k for rec in data for k in rec))
+    rows = [{k: None if v is None else str(v) for k, v in rec.items()} for rec in data]
+    return pa.schema([pa.field(k, pa.string()) for k in names]), rows
+
+
+def _column_type(types, name: str):
+    """types(dict 또는 이름 → 타입 함수)에서 컬럼 타입 (없으면 None)"""
+    if types is None:
+        return None
+    return types(name) if callable(types) else types.get(name)
+
+
+def _cast_strings(page: int, batch: pa.RecordBatch, types) -> pa.RecordBatch:
+    """문자열 배치에서 types에 있는 컬럼만 변환 (빈 문자열은 결측, 변환할 수 없는 값은 ValueError)"""
+    arrays, fields = [], []
+    for field, arr in zip(batch.schema, batch.columns):
+        t = _column_type(types, field.name)
+        if t is not None and t != field.type:
+            arr = pc.if_else(pc.equal(pc.utf8_trim_whitespace(arr), ""), pa.scalar(None, pa.string()), arr)
+            try:
+                arr = pc.cast(arr, t)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"{page}페이지 '{field.name}' 컬럼을 {t}(으)로 바꿀 수 없습니다: {e}")
+            field = pa.field(field.name, t)
+        arrays.append(arr)
+        fields.append(field)
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _page_batch(page: int, data: list[dict], schema: pa.Schema | None, as_string: bool, types=None):
+    """
+    한 페이지 → (앞 페이지들과 합친 스키마, 배치)
+    - 페이지마다 타입을 따로 추론해 지금까지의 스키마와 합침 (int + float → double, 비어 있던 컬럼 + 문자열 → 문자열,
+      새 필드는 뒤에 추가) → 값을 스키마에 맞춰 자르거나 버리지 않음
+    - 합칠 수 없는 타입(예: 숫자 ↔ 문자열)은 ValueError
+    - types: 문자열로 받은 값 중 이 컬럼들만 지정한 타입으로 변환 (as_string일 때)
+    """
+    typed = None
+    if as_string:
+        inferred, data = _as_strings(data)
+        if types is not None:
+            typed = _cast_strings(page, pa.RecordBatch.from_pylist(data, schema=inferred), types)
+            inferred = typed.schema
+    else:
+        try:
+            inferred = pa.RecordBatch.from_pylist(data).schema
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"{page}페이지 안에서 타입이 섞여 있습니다: {e} (as_string=True로 받아 보세요)")
+    try:
+        merged = inferred if schema is None else pa.unify_schemas([schema, inferred], promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"{page}페이지 타입을 앞 페이지 스키마와 합칠 수 없습니다: {e} (as_string=True로 받아 보세요)")
+    if typed is None:
+        return merged, pa.RecordBatch.from_pylist(data, schema=merged)
+    # 변환한 배치를 합친 스키마 순서/타입에 맞춤 (이 페이지에 없는 컬럼은 결측)
+    names = typed.schema.names
+    return merged, pa.RecordBatch.from_arrays(
+        [typed.column(names.index(f.name)).cast(f.type) if f.name in names else pa.nulls(typed.num_rows, f.type)
+         for f in merged], schema=merged)
+
+
+def iter_batches(url: str, service_key: str, per_page: int = 1000, max_pages: int | None = None,
+                 workers: int = 8, schema: pa.Schema | None = None, as_string: bool = False,
+                 widen: bool = True, types=None, **kw):
+    """
+    페이지마다 pyarrow RecordBatch 하나씩 반환 (제너레이터)
+    - 스키마는 페이지마다 추론해 앞 페이지들과 합침 → 뒤 페이지에서 타입이 넓어지면 이후 배치 스키마도 넓어짐
+    - schema: 시작 스키마 (이 스키마보다 넓은 값이 오면 위와 같이 넓힘)
+    - as_string=True: API 값을 모두 문자열로 (타입 추론 없음, 페이지마다 타입이 달라도 안전)
+    - types: {컬럼명: pyarrow 타입} 또는 컬럼명 → 타입(없으면 None) 함수, 문자열로 받은 값 중 이 컬럼만 변환
+    - widen=False: 첫 배치 뒤로 스키마가 바뀌어야 하면 ValueError (이미 쓴 파일 스키마는 바꿀 수 없을 때)
+    """
+    for page, data in iter_pages(url, service_key, per_page, max_pages, workers, **kw):
+        if not data:
+            continue
+        merged, batch = _page_batch(page, data, schema, as_string, types)
+        if not widen and schema is not None and not merged.equals(schema):
+            raise ValueError(f"{page}페이지에서 스키마가 바뀌었습니다 (앞: {schema}, 지금: {merged}). "
+                             "schema를 넓게 지정하거나 as_string=True로 받으세요.")
+        schema = merged
+        yield batch
+
+
+def write_pages(url: str, service_key: str, out_path, per_page: int = 1000,
+                max_pages: int | None = None, workers: int = 8, schema: pa.Schema | None = None,
+                as_string: bool | None = None, types=None, **kw) -> int:
+    """
+    전체 페이지를 배치 단위로 파일에 바로 저장 → 저장한 행 수 반환
+    - 확장자로 형식 결정: .parquet / .csv (CSV는 기존 저장 방식과 같은 utf-8-sig)
+    - 파일 스키마는 첫 배치에서 정해지므로 기본은 API 값을 문자열로 저장 (as_string=True)
+      · schema를 주면 그 타입으로 저장 (뒤 페이지 값이 스키마보다 넓으면 ValueError, 값을 자르지 않음)
+      · types를 주면 문자열로 받되 해당 컬럼만 그 타입으로 저장 (예: 시간대 인원수 → int64, 뒤에서 다시 파싱할 필요 없음)
+    - 임시 파일에 쓴 뒤 os.replace → 중간에 끊기거나 받은 행이 없으면 기존 파일은 그대로
+    """
+    out_path = Path(out_path)
+    fmt = out_path.suffix.lower()
+    if fmt not in (".parquet", ".csv"):
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {out_path.suffix} (.parquet / .csv)")
+    if as_string is None:
+        as_string = schema is None
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=out_path.parent, prefix=".tmp_", suffix=fmt)
+    rows = 0
+    writer = None
+    try:
+        with os.fdopen(fd, "wb") as f:
+            try:
+                for batch in iter_batches(url, service_key, per_page, max_pages, workers,
+                                          schema=schema, as_string=as_string, widen=False, types=types, **kw):
+                    if writer is None:
+                        if fmt == ".csv":
+                            f.write("\ufeff".encode("utf-8"))   # BOM은 첫 배치가 왔을 때만
+                        writer = (pq.ParquetWriter(f, batch.schema) if fmt == ".parquet"
+                                  else pacsv.CSVWriter(f, batch.schema))
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+            finally:
+                if writer is not None:
+                    writer.close()       # 파일을 닫기 전에 (실패해도 임시 파일만 지움)
+        if writer is None:
+            os.remove(tmp)
+            print(f"[건너뜀] 받은 행이 없어 저장하지 않았습니다 (기존 파일 유지): {out_path}")
+            return 0
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return rows
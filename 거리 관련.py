@@ -6,44 +6,77 @@
   1) 구별_역_vs_시설_모든쌍_거리_m.csv
   2) 역별_최근접시설.csv
   3) 시설별_최근접역.csv
+- 자치구 경계와 상관없이 서울 전체에서 찾은 최근접 결과도 함께 저장 (공간 색인, 색인은 결과 폴더에 보관):
+  4) 역별_최근접시설_서울전체.csv
+  5) 시설별_최근접역_서울전체.csv
+- 역별 접근성 지표 (반경별 시설 수 / 유형별 시설 수 / 반경 안 가까운 시설 이름, 같은 색인 사용):
+  6) 역별_접근성_지표.csv
+- 역×시설 거리는 CACHE_DIR(OUT_DIR 아래)에 좌표 표 내용 해시로 저장 (거리_캐시)
+  · 시설만 몇 개 늘면 새 시설 열만 계산, 두 표가 그대로면 계산 없이 읽고 1) 전체쌍 CSV도 다시 쓰지 않음
+- SAVE_ALL_PAIRS = False 면 1)을 건너뛰고 2), 3)을 시설 블록 단위로 계산 (거리_블록, 시설이 아주 많을 때 메모리 일정)
 """
 
+import json
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from 인코딩감지 import read_csv_auto
+from 공간_색인 import load_or_build
+from 거리_블록 import BLOCK, PointSet, stream_reduce
+from 거리_캐시 import cached_distances, row_ids, table_hash
+from 접근성_지표 import accessibility_table
+
 # ===== 설정값 =====
 BASE_DIR = "."  # 현재 폴더 기준 (필요시 절대경로로 수정)
 STATION_CSV = "서울교통공사 1~9호선과 위경도 자치구 포함.csv"
 FACILITY_CSV = "서울 문화체육 관광분야전시관 시설 데이터.csv"
 OUT_DIR = "station_facility_distances"  # 결과 저장 폴더
+INDEX_DIR = "색인"                       # 공간 색인 저장 폴더 (OUT_DIR 아래, 원본 CSV가 바뀌면 다시 만듦)
+RADII = (250, 500, 1000, 1500)           # 접근성 지표: 시설 수를 셀 반경 (m)
+CAPS = ((500, None), (1000, 3), (1500, 5))  # 접근성 지표: (반경 m, 최대 개수, None = 전부) 가까운 순 시설 이름
+SAVE_ALL_PAIRS = True                    # False: 전체쌍 CSV 없이 블록 단위로 최근접만 계산
+DIST_DTYPE = np.float64                  # 블록 계산/캐시 정밀도 (np.float32면 메모리·디스크 절반, 오차 1m 안팎)
+CACHE_DIR = "거리캐시"                   # 거리 행렬 캐시 폴더 (OUT_DIR 아래, SAVE_ALL_PAIRS = True일 때)
 
 # ===== 유틸 =====
-def read_csv_smart(path: str) -> pd.DataFrame:
-    """인코딩을 자동 시도하여 CSV 읽기"""
-    for enc in ("utf-8-sig", "cp949", "euc-kr", "utf-8"):
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception:
-            pass
-    # 마지막 시도 (에러 무시)
-    return pd.read_csv(path, encoding_errors="ignore")
-
-def haversine_m(lat1, lon1, lat2, lon2):
+# 전체쌍 / 최근접 결과 공통 컬럼 (역 정보 → 시설 정보 → 거리)
+DIST_COLS = ["자치구", "역명", "호선", "역위도", "역경도", "시설명", "시설유형", "시설위도", "시설경도", "거리_m"]
+
+
+def pair_table(gu, st_g, fc_g, i, j, dist):
     """
-    하버사인 거리 계산 (미터)
-    - lat1, lon1: (n,1) 형태 배열
-    - lat2, lon2: (1,m) 형태 배열
-    반환: (n,m) 거리 행렬
+    (역 위치 i, 시설 위치 j, 거리) 배열 → DIST_COLS 롱테이블
+    - 전체쌍: i = np.repeat(역 번호, 시설 수), j = np.tile(시설 번호, 역 수), dist = 거리행렬.ravel()
+    - 최근접: argmin으로 고른 (i, j) 만
     """
-    R = 6371000.0  # meters
-    phi1 = np.radians(lat1)
-    phi2 = np.radians(lat2)
-    dphi = np.radians(lat2 - lat1)
-    dl   = np.radians(lon2 - lon1)
-    a = np.sin(dphi/2.0)**2 + np.cos(phi1) * np.cos(phi2) * np.sin(dl/2.0)**2
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-    return R * c
+    sc = [st_g.iloc[:, k].to_numpy() for k in range(4)]   # 역명, 호선, 위도, 경도
+    fc = [fc_g.iloc[:, k].to_numpy() for k in range(4)]   # 시설명, 시설유형, 위도, 경도
+    return pd.DataFrame({
+        "자치구": np.full(len(i), gu, dtype=object),
+        "역명": sc[0][i],
+        "호선": sc[1][i],
+        "역위도": sc[2][i].astype(float),
+        "역경도": sc[3][i].astype(float),
+        "시설명": fc[0][j],
+        "시설유형": fc[1][j],
+        "시설위도": fc[2][j].astype(float),
+        "시설경도": fc[3][j].astype(float),
+        "거리_m": np.asarray(dist, dtype=float),
+        "_i": i,
+        "_j": j,
+    })
+
+
+def nearest(cands, key: str):
+    """
+    구별 최근접 후보 → (자치구, key) 별로 가장 가까운 한 행
+    - 거리가 같으면 먼저 나온 쌍(역 순서, 시설 순서)을 남김 (전체쌍 정렬 후 첫 행과 같은 기준)
+    """
+    cands = cands.dropna(subset=["자치구", key])
+    cands = cands.sort_values(["자치구", key, "거리_m", "_i", "_j"], kind="stable")
+    return cands.drop_duplicates(["자치구", key]).drop(columns=["_i", "_j"]).reset_index(drop=True)
 
 # ===== 메인 로직 =====
 def main():
@@ -52,8 +85,8 @@ def main():
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # 1) 데이터 로딩
-    st = read_csv_smart(str(base / STATION_CSV))
-    fc = read_csv_smart(str(base / FACILITY_CSV))
+    st = read_csv_auto(base / STATION_CSV)
+    fc = read_csv_auto(base / FACILITY_CSV)
 
     # 2) 컬럼 정리(공백 제거)
     st.columns = [c.strip() for c in st.columns]
@@ -71,56 +104,81 @@ def main():
         df[lng] = pd.to_numeric(df[lng], errors="coerce")
 
     # 유효 좌표/자치구만
-    st_v = st.dropna(subset=[st_cols["gu"], st_cols["lat"], st_cols["lng"]]).copy()
-    fc_v = fc.dropna(subset=[fc_cols["gu"], fc_cols["lat"], fc_cols["lng"]]).copy()
+    st_v = st.dropna(subset=[st_cols["gu"], st_cols["lat"], st_cols["lng"]]).reset_index(drop=True)
+    fc_v = fc.dropna(subset=[fc_cols["gu"], fc_cols["lat"], fc_cols["lng"]]).reset_index(drop=True)
+    st_keys = [st_cols["gu"], st_cols["name"], st_cols["line"], st_cols["lat"], st_cols["lng"]]
+    fc_keys = [fc_cols["gu"], fc_cols["name"], fc_cols["cat"], fc_cols["lat"], fc_cols["lng"]]
+
+    # 서울 전체 역 × 시설 거리 (캐시에 없는 시설 열만 계산), 두 표 해시가 지난번과 같으면 전체쌍 CSV는 그대로 둠
+    full_path = out_dir / "구별_역_vs_시설_모든쌍_거리_m.csv"
+    stamp_path = full_path.with_suffix(".json")
+    write_pairs = SAVE_ALL_PAIRS
+    if SAVE_ALL_PAIRS:
+        dist_all, cache = cached_distances(st_v, fc_v, out_dir / CACHE_DIR, st_cols=st_keys, fc_cols=fc_keys,
+                                           dtype=DIST_DTYPE, block=BLOCK)
+        # 전체쌍 CSV는 표 행 순서대로 쓰므로 순서까지 포함한 해시로 비교
+        stamp = {"역_해시": table_hash(row_ids(st_v, st_keys), ordered=True),
+                 "시설_해시": table_hash(row_ids(fc_v, fc_keys), ordered=True),
+                 "dtype": np.dtype(DIST_DTYPE).name}
+        if full_path.exists() and stamp_path.exists():
+            with open(stamp_path, "r", encoding="utf-8") as f:
+                write_pairs = json.load(f) != stamp
+        print(f"[거리 캐시] 새로 계산한 시설 {cache['계산한_시설수']}곳 / 전체 {len(fc_v)}곳 ({cache['캐시']})")
 
     # 4) 자치구 교집합만 대상으로 처리
     districts = sorted(set(st_v[st_cols["gu"]]).intersection(set(fc_v[fc_cols["gu"]])))
 
-    rows = []
+    pairs, near_fac, near_st = [], [], []
     for gu in districts:
-        st_g = st_v[st_v[st_cols["gu"]] == gu][[st_cols["name"], st_cols["line"], st_cols["lat"], st_cols["lng"]]].reset_index(drop=True)
-        fc_g = fc_v[fc_v[fc_cols["gu"]] == gu][[fc_cols["name"], fc_cols["cat"], fc_cols["lat"], fc_cols["lng"]]].reset_index(drop=True)
+        st_pos = np.flatnonzero((st_v[st_cols["gu"]] == gu).to_numpy())
+        fc_pos = np.flatnonzero((fc_v[fc_cols["gu"]] == gu).to_numpy())
+        st_g = st_v.iloc[st_pos][[st_cols["name"], st_cols["line"], st_cols["lat"], st_cols["lng"]]].reset_index(drop=True)
+        fc_g = fc_v.iloc[fc_pos][[fc_cols["name"], fc_cols["cat"], fc_cols["lat"], fc_cols["lng"]]].reset_index(drop=True)
         if st_g.empty or fc_g.empty:
             continue
 
-        # 벡터화 계산 (n역 × m시설)
-        s_lat = st_g[st_cols["lat"]].values.reshape(-1, 1)
-        s_lng = st_g[st_cols["lng"]].values.reshape(-1, 1)
-        f_lat = fc_g[fc_cols["lat"]].values.reshape(1, -1)
-        f_lng = fc_g[fc_cols["lng"]].values.reshape(1, -1)
-
-        dmat = haversine_m(s_lat, s_lng, f_lat, f_lng)  # (n, m)
-
-        # 롱테이블로 펼치기
-        for i in range(st_g.shape[0]):
-            for j in range(fc_g.shape[0]):
-                rows.append([
-                    gu,
-                    st_g.loc[i, st_cols["name"]],
-                    st_g.loc[i, st_cols["line"]],
-                    float(st_g.loc[i, st_cols["lat"]]),
-                    float(st_g.loc[i, st_cols["lng"]]),
-                    fc_g.loc[j, fc_cols["name"]],
-                    fc_g.loc[j, fc_cols["cat"]],
-                    float(fc_g.loc[j, fc_cols["lat"]]),
-                    float(fc_g.loc[j, fc_cols["lng"]]),
-                    float(dmat[i, j])
-                ])
+        rows_n, cols_m = np.arange(len(st_g)), np.arange(len(fc_g))
+        if not SAVE_ALL_PAIRS:
+            # 시설 BLOCK 개씩 거리 블록만 만들어 최솟값/argmin 누적 (n × m 행렬 없음)
+            r = stream_reduce(PointSet(st_g[st_cols["lat"]], st_g[st_cols["lng"]], dtype=DIST_DTYPE),
+                              PointSet(fc_g[fc_cols["lat"]], fc_g[fc_cols["lng"]], dtype=DIST_DTYPE), block=BLOCK)
+            near_fac.append(pair_table(gu, st_g, fc_g, rows_n, r.row_arg, r.row_min))
+            near_st.append(pair_table(gu, st_g, fc_g, r.col_arg, cols_m, r.col_min))
+            continue
 
-    # 5) 결과 데이터프레임
-    dist_cols = ["자치구", "역명", "호선", "역위도", "역경도", "시설명", "시설유형", "시설위도", "시설경도", "거리_m"]
-    dist_df = pd.DataFrame(rows, columns=dist_cols)
+        # 캐시된 서울 전체 거리에서 이 자치구 역 × 시설만 (n역 × m시설)
+        dmat = np.asarray(dist_all[np.ix_(st_pos, fc_pos)], dtype=float)
+        n, m = dmat.shape
 
-    # 6) 저장: 전체쌍
-    full_path = out_dir / "구별_역_vs_시설_모든쌍_거리_m.csv"
-    dist_df.to_csv(full_path, index=False, encoding="utf-8-sig")
+        # 롱테이블: 역 정보는 시설 수만큼 반복(repeat), 시설 정보는 역 수만큼 이어 붙임(tile)
+        if write_pairs:
+            pairs.append(pair_table(gu, st_g, fc_g, np.repeat(rows_n, m), np.tile(cols_m, n), dmat.ravel()))
+
+        # 최근접: 행렬에서 바로 argmin (역마다 가장 가까운 시설 / 시설마다 가장 가까운 역)
+        j_best = dmat.argmin(axis=1)
+        near_fac.append(pair_table(gu, st_g, fc_g, rows_n, j_best, dmat[rows_n, j_best]))
+        i_best = dmat.argmin(axis=0)
+        near_st.append(pair_table(gu, st_g, fc_g, i_best, cols_m, dmat[i_best, cols_m]))
+
+    # 5) 결과 데이터프레임
+    empty = pd.DataFrame(columns=DIST_COLS + ["_i", "_j"])
+    dist_df = (pd.concat(pairs, ignore_index=True) if pairs else empty)[DIST_COLS]
+    near_fac_df = pd.concat(near_fac, ignore_index=True) if near_fac else empty
+    near_st_df = pd.concat(near_st, ignore_index=True) if near_st else empty
+
+    # 6) 저장: 전체쌍 (SAVE_ALL_PAIRS = False면 건너뜀, 두 표가 지난번과 같으면 기존 파일 유지)
+    if write_pairs:
+        dist_df.to_csv(full_path, index=False, encoding="utf-8-sig")
+        with open(stamp_path, "w", encoding="utf-8") as f:
+            json.dump(stamp, f, ensure_ascii=False, indent=1)
+    elif SAVE_ALL_PAIRS:
+        full_path = f"{full_path} ([건너뜀] 역/시설 표 변경 없음)"
+    else:
+        full_path = "[건너뜀] SAVE_ALL_PAIRS = False"
 
     # 7) 역별 최근접 시설
     nearest_fac_per_station = (
-        dist_df.sort_values(["자치구", "역명", "거리_m"])
-               .groupby(["자치구", "역명"], as_index=False)
-               .first()
+        nearest(near_fac_df, "역명")
                .rename(columns={
                    "시설명":"최근접_시설명",
                    "시설유형":"최근접_시설유형",
@@ -134,9 +192,7 @@ def main():
 
     # 8) 시설별 최근접 역
     nearest_st_per_fac = (
-        dist_df.sort_values(["자치구", "시설명", "거리_m"])
-               .groupby(["자치구", "시설명"], as_index=False)
-               .first()
+        nearest(near_st_df, "시설명")[["자치구", "시설명"] + [c for c in DIST_COLS if c not in ("자치구", "시설명")]]
                .rename(columns={
                    "역명":"최근접_역명",
                    "호선":"최근접_역_호선",
@@ -148,11 +204,43 @@ def main():
     near_st_path = out_dir / "시설별_최근접역.csv"
     nearest_st_per_fac.to_csv(near_st_path, index=False, encoding="utf-8-sig")
 
+    # 9) 서울 전체 최근접 (자치구 경계 무시, 공간 색인 k=1)
+    st_idx = load_or_build(out_dir / INDEX_DIR / "역", base / STATION_CSV, lat=st_cols["lat"], lng=st_cols["lng"])
+    fc_idx = load_or_build(out_dir / INDEX_DIR / "시설", base / FACILITY_CSV, lat=fc_cols["lat"], lng=fc_cols["lng"])
+
+    city_fac = fc_idx.nearest(st_idx.points[st_keys], k=1, lat=st_cols["lat"], lng=st_cols["lng"], prefix="최근접_")
+    city_fac = city_fac[st_keys + ["최근접_" + c for c in fc_keys] + ["거리_m"]]
+    city_fac.columns = ["자치구", "역명", "호선", "역위도", "역경도",
+                        "최근접_시설_자치구", "최근접_시설명", "최근접_시설유형", "최근접_시설_위도", "최근접_시설_경도",
+                        "최근접_시설까지_m"]
+    city_fac["다른자치구"] = city_fac["자치구"] != city_fac["최근접_시설_자치구"]
+    city_fac_path = out_dir / "역별_최근접시설_서울전체.csv"
+    city_fac.to_csv(city_fac_path, index=False, encoding="utf-8-sig")
+
+    city_st = st_idx.nearest(fc_idx.points[fc_keys], k=1, lat=fc_cols["lat"], lng=fc_cols["lng"], prefix="최근접_")
+    city_st = city_st[fc_keys + ["최근접_" + c for c in st_keys] + ["거리_m"]]
+    city_st.columns = ["자치구", "시설명", "시설유형", "시설위도", "시설경도",
+                       "최근접_역_자치구", "최근접_역명", "최근접_역_호선", "최근접_역_위도", "최근접_역_경도",
+                       "최근접_역까지_m"]
+    city_st["다른자치구"] = city_st["자치구"] != city_st["최근접_역_자치구"]
+    city_st_path = out_dir / "시설별_최근접역_서울전체.csv"
+    city_st.to_csv(city_st_path, index=False, encoding="utf-8-sig")
+
+    # 10) 역별 접근성 지표 (가장 큰 반경 안 쌍만 한 번 꺼내서 모든 반경/유형/이름 목록 계산)
+    access = accessibility_table(st_idx.points, fc_idx, radii=RADII, category=fc_cols["cat"],
+                                 name=fc_cols["name"], caps=CAPS, lat=st_cols["lat"], lng=st_cols["lng"],
+                                 keep=[st_cols["gu"], st_cols["name"], st_cols["line"]])
+    access_path = out_dir / "역별_접근성_지표.csv"
+    access.to_csv(access_path, index=False, encoding="utf-8-sig")
+
     print("✅ 완료")
     print(f"- 전체쌍: {full_path}")
     print(f"- 역별 최근접: {near_fac_path}")
     print(f"- 시설별 최근접: {near_st_path}")
-    print(f"행 개수(전체쌍/역->시설/시설->역): {dist_df.shape} / {nearest_fac_per_station.shape} / {nearest_st_per_fac.shape}")
+    print(f"행 개수(전체쌍/역->시설/시설->역): {dist_df.shape if write_pairs else '유지'} / {nearest_fac_per_station.shape} / {nearest_st_per_fac.shape}")
+    print(f"- 서울 전체 역별 최근접: {city_fac_path} (다른 자치구 시설이 더 가까운 역 {int(city_fac['다른자치구'].sum())}곳)")
+    print(f"- 서울 전체 시설별 최근접: {city_st_path} (다른 자치구 역이 더 가까운 시설 {int(city_st['다른자치구'].sum())}곳)")
+    print(f"- 역별 접근성 지표: {access_path} (반경 {', '.join(f'{r}m' for r in RADII)})")
 
 if __name__ == "__main__":
     main()
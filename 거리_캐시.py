@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+역 × 시설 거리 행렬 캐시 (좌표 표 내용 해시로 찾고, 새로 생긴 시설 열만 계산)
+- 행마다 (이름, 위도, 경도) 내용 해시 → uint64 ID (파일 이름/수정시각이 아니라 내용 기준)
+- 역 ID 집합(정렬한 고유 ID)의 해시 + dtype 으로 캐시 폴더를 고름
+  → 역 표 순서가 바뀌어도 같은 캐시, 역이 추가/삭제되면 새 폴더에서 처음부터
+  · 역_id.npy           : 저장된 역 축 순서 (정렬한 고유 ID)
+  · 거리_NNNNN.npy      : 시설 조각 하나의 (시설, 역) 거리_m (읽을 때 메모리 맵)
+  · 시설_id_NNNNN.npy   : 그 조각의 시설 ID
+  · 정보.json           : 역 해시, dtype, 조각 목록 (마지막에 기록 → 중간에 끊긴 조각은 무시)
+- 요청한 시설 중 캐시에 없는 ID만 거리_블록으로 블록 단위 계산해 새 조각으로 저장
+  (기존 조각은 읽지도 다시 쓰지도 않음, 파일은 임시 파일에 쓴 뒤 os.replace)
+- 결과는 요청한 역/시설 순서로 조각마다 필요한 줄만 모음 (조각 하나를 순서 그대로 요청하면 메모리 맵 그대로)
+  예) D, info = cached_distances(역, 시설, "거리캐시", st_cols=("역명", "위도", "경도"), fc_cols=("POI_NM", "위도", "경도"))
+      D[i, j]   # 역 i ↔ 시설 j 거리_m (n, m),  info["계산한_시설수"] == 0 이면 전부 캐시에서
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from 거리_블록 import BLOCK, PointSet, block_distance
+
+
+def row_ids(df: pd.DataFrame, cols) -> np.ndarray:
+    """표의 cols 내용 → 행마다 uint64 해시 (순서/인덱스와 무관, 내용이 같으면 같은 ID)"""
+    cols = list(cols)
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise KeyError(f"컬럼이 없습니다: {missing}. CSV를 확인하세요.")
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy(dtype=np.uint64)
+
+
+def table_hash(ids: np.ndarray, ordered: bool = False) -> str:
+    """
+    행 ID → 표 전체 해시 문자열
+    - 기본: 정렬한 고유 ID 기준 (행 순서/중복과 무관, 캐시 키)
+    - ordered=True: 행 순서까지 포함 (순서대로 쓰는 결과 파일이 최신인지 확인할 때)
+    """
+    ids = np.asarray(ids, dtype=np.uint64)
+    return hashlib.sha1(np.ascontiguousarray(ids if ordered else np.unique(ids)).tobytes()).hexdigest()
+
+
+def _save_npy(path: Path, arr: np.ndarray):
+    """임시 파일에 쓴 뒤 교체 (저장 중에 끊겨도 기존 파일/캐시가 깨지지 않음)"""
+    tmp = path.with_name(f".tmp_{path.name}")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def _save_meta(path: Path, meta: dict):
+    tmp = path.with_name(f".tmp_{path.name}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _distances(st: PointSet, fc: PointSet, block: int) -> np.ndarray:
+    """새 시설들 × 역 거리 (시설 줄 단위, 블록마다 계산해서 채움)"""
+    out = np.empty((len(fc), len(st)), dtype=np.result_type(st.dtype, fc.dtype))
+    for j0 in range(0, len(fc), block):
+        j1 = min(j0 + block, len(fc))
+        out[j0:j1] = block_distance(st, fc, j0, j1).T
+    return out
+
+
+def _load_shards(folder: Path, st_hash: str, n_st: int) -> list[tuple[str, np.ndarray, np.ndarray]]:
+    """정보.json에 기록된 조각들 → [(이름, 시설 ID, 거리 메모리 맵)], 맞지 않으면 빈 목록 (처음부터)"""
+    meta_path = folder / "정보.json"
+    if not meta_path.exists():
+        return []
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("역_해시") != st_hash:
+        return []
+    shards = []
+    for name in meta.get("조각", []):
+        dist = np.load(folder / f"거리_{name}.npy", mmap_mode="r")
+        ids = np.load(folder / f"시설_id_{name}.npy")
+        if dist.shape != (len(ids), n_st):
+            return []
+        shards.append((name, ids, dist))
+    return shards
+
+
+def cached_distances(stations: pd.DataFrame, facilities: pd.DataFrame, cache_dir,
+                     st_cols=("역명", "위도", "경도"), fc_cols=("POI_NM", "위도", "경도"),
+                     dtype=np.float32, block: int = BLOCK) -> tuple[np.ndarray, dict]:
+    """
+    역 표 × 시설 표 거리_m 행렬 (n, m) + 캐시 정보
+    - *_cols: (ID에 쓸 컬럼..., 위도, 경도), 마지막 두 개가 좌표 (결측 좌표 행은 미리 빼고 넘기세요)
+    - 역 ID 집합이 같은 캐시가 있으면 없는 시설만 계산해서 새 조각으로 덧붙임
+    - 캐시 정보: {"역_해시", "시설_해시", "계산한_시설수", "캐시": 폴더}
+    """
+    st_cols, fc_cols = list(st_cols), list(fc_cols)
+    dtype = np.dtype(dtype)
+    st_ids = row_ids(stations, st_cols)
+    fc_ids = row_ids(facilities, fc_cols)
+    st_hash = table_hash(st_ids)
+    folder = Path(cache_dir) / f"{st_hash[:16]}_{dtype.name}"
+
+    # 저장 역 축 = 정렬한 고유 ID (같은 내용의 역은 한 줄)
+    stored_st, first_st = np.unique(st_ids, return_index=True)
+    shards = _load_shards(folder, st_hash, len(stored_st))
+    stored_fc = np.concatenate([ids for _, ids, _ in shards]) if shards else np.empty(0, dtype=np.uint64)
+
+    # 캐시에 없는 시설만 (같은 내용이 여러 번 나오면 한 번만) 계산해서 새 조각으로
+    new = ~np.isin(fc_ids, stored_fc)
+    new_ids, first = np.unique(fc_ids[new], return_index=True)
+    if len(new_ids):
+        rows = np.flatnonzero(new)[first]
+        st_lat = stations[st_cols[-2]].to_numpy()[first_st]
+        st_lng = stations[st_cols[-1]].to_numpy()[first_st]
+        fc_pts = PointSet(facilities[fc_cols[-2]].to_numpy()[rows], facilities[fc_cols[-1]].to_numpy()[rows], dtype=dtype)
+        added = _distances(PointSet(st_lat, st_lng, dtype=dtype), fc_pts, block)
+
+        folder.mkdir(parents=True, exist_ok=True)
+        name = f"{len(shards):05d}"
+        if not shards:
+            _save_npy(folder / "역_id.npy", stored_st)
+        _save_npy(folder / f"거리_{name}.npy", added)
+        _save_npy(folder / f"시설_id_{name}.npy", new_ids)
+        _save_meta(folder / "정보.json", {"역_해시": st_hash, "dtype": dtype.name,
+                                          "조각": [s for s, _, _ in shards] + [name]})
+        shards.append((name, new_ids, np.load(folder / f"거리_{name}.npy", mmap_mode="r")))
+        stored_fc = np.concatenate([stored_fc, new_ids])
+
+    # 요청한 역/시설 순서로 모으기 (조각마다 필요한 시설 줄만 읽음)
+    st_pos = pd.Index(stored_st).get_indexer(st_ids)
+    fc_pos = pd.Index(stored_fc).get_indexer(fc_ids)
+    info = {"역_해시": st_hash, "시설_해시": table_hash(fc_ids), "계산한_시설수": int(len(new_ids)), "캐시": folder}
+    if (len(shards) == 1 and np.array_equal(st_pos, np.arange(len(stored_st)))
+            and np.array_equal(fc_pos, np.arange(len(stored_fc)))):
+        return shards[0][2].T, info
+
+    D = np.empty((len(st_ids), len(fc_ids)), dtype=dtype)
+    offset = 0
+    for _, ids, dist in shards:
+        cols = np.flatnonzero((fc_pos >= offset) & (fc_pos < offset + len(ids)))
+        if len(cols):
+            D[:, cols] = dist[fc_pos[cols] - offset][:, st_pos].T
+        offset += len(ids)
+    return D, info
@@ -12,10 +12,14 @@ import sys
 import platform
 import warnings
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import font_manager, rcParams
 
+from 인코딩감지 import read_csv_auto
+from 시간대_컬럼 import hour_columns
+from 날짜_차원 import attach_periods
+from 순위_엔진 import Ranker
+
 warnings.filterwarnings("ignore")
 
 # ------------------------------------------------------------
@@ -55,21 +59,11 @@ set_korean_font()
 # ------------------------------------------------------------
 # 2) CSV 읽기 (인코딩 자동 탐색)
 # ------------------------------------------------------------
-def read_csv_robust(path):
-    encodings = ["utf-8-sig", "cp949", "euc-kr", "utf-8"]
-    last_err = None
-    for enc in encodings:
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception as e:
-            last_err = e
-    raise last_err
-
 if not os.path.exists(INPUT_CSV):
     print(f"[오류] 입력 파일 없음: {INPUT_CSV}")
     sys.exit(1)
 
-df = read_csv_robust(INPUT_CSV)
+df = read_csv_auto(INPUT_CSV)
 df.columns = [re.sub(r"\s+", "", str(c)) for c in df.columns]
 
 # ------------------------------------------------------------
@@ -80,27 +74,11 @@ if "역명" not in df.columns:
     sys.exit(1)
 STATION = "역명"
 
-def to_month_value(x):
-    s = str(x).strip()
-    m = re.match(r"^\d{4}-(\d{1,2})$", s)
-    if m:
-        return int(m.group(1))
-    m = re.match(r"^\d{6}$", s)
-    if m:
-        return int(s[4:6])
-    if re.match(r"^\d{1,2}$", s):
-        return int(s)
-    try:
-        return pd.to_datetime(s).month
-    except Exception:
-        return np.nan
-
 MONTH_COL = "월" if "월" in df.columns else None
 if MONTH_COL is None:
     for cand in ["날짜", "수송일자", "기준일자", "년월일", "Date"]:
         if cand in df.columns:
-            df["_월"] = df[cand].apply(to_month_value)
-            MONTH_COL = "_월"
+            MONTH_COL = cand
             break
 if MONTH_COL is None:
     print("[오류] 월/날짜 정보가 없습니다.")
@@ -115,7 +93,7 @@ if WEEKFLAG_COL is None:
     print("[오류] 평일/휴일 컬럼 없음.")
     sys.exit(1)
 
-time_cols = [c for c in df.columns if "시간대" in c]
+time_cols = hour_columns(df.columns)
 df[time_cols] = df[time_cols].apply(pd.to_numeric, errors="coerce")
 
 TOTAL_COL = None
@@ -130,17 +108,8 @@ if TOTAL_COL is None:
 # ------------------------------------------------------------
 # 4) 월 → 계절
 # ------------------------------------------------------------
-def month_to_season(m):
-    m = to_month_value(m)
-    if pd.isna(m): return np.nan
-    m = int(m)
-    if m in [3,4,5]: return "봄(Spring)"
-    if m in [6,7,8]: return "여름(Summer)"
-    if m in [9,10,11]: return "가을(Autumn)"
-    if m in [12,1,2]: return "겨울(Winter)"
-    return np.nan
-
-df["계절"] = df[MONTH_COL].apply(month_to_season)
+# 월 값 형식("2021-07", "202107", "Jul-21", 날짜 …)이 섞여 있어도 고유값만 한 번 파싱
+df = attach_periods(df, MONTH_COL, attrs=("계절",))
 df = df.dropna(subset=["계절"])
 
 # ------------------------------------------------------------
@@ -160,16 +129,11 @@ if df_weekday.empty:
 # ------------------------------------------------------------
 # 6) 집계 & Top10
 # ------------------------------------------------------------
-agg = df_weekday.groupby(["계절", STATION], as_index=False)[TOTAL_COL].sum()
-
 SEASONS = ["봄(Spring)", "여름(Summer)", "가을(Autumn)", "겨울(Winter)"]
-top10_all = []
-for s in SEASONS:
-    sub = agg[agg["계절"]==s].sort_values(TOTAL_COL, ascending=False).head(10).copy()
-    if not sub.empty:
-        sub["순위"] = range(1,len(sub)+1)
-        top10_all.append(sub)
-top10_all = pd.concat(top10_all, ignore_index=True)
+
+# 모든 계절의 Top10을 한 번에 (계절 × 역 합계 → 계절 안 순위)
+top10_all = Ranker(df_weekday, station=STATION).top(["계절"], TOTAL_COL, k=10)
+top10_all = top10_all[["계절", STATION, TOTAL_COL, "순위"]]
 
 # ------------------------------------------------------------
 # 7) 저장 (CSV, XLSX)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+역 / 시설 공간 색인 (서울 전체 최근접 k개, 반경 안 검색)
+- 위경도를 단위 구 위의 3차원 좌표로 바꿔 KD-tree(scipy cKDTree)에 넣음
+  · 두 점 사이 직선(현) 거리는 구면 거리와 순서가 같음 → 최근접 순서/반경 판정이 하버사인과 정확히 일치
+  · 거리(m) = 2R·asin(현/2), 반경 r(m) → 현 2·sin(r/2R)
+- 자치구 경계와 상관없이 서울 전체에서 검색 (구 경계 너머 100m 시설도 찾음)
+- 색인(좌표 + 속성 표)을 저장해 두고 원본 CSV 크기/수정시각이 같으면 CSV 파싱 없이 바로 읽음
+  예) fc = load_or_build("색인/시설", "서울 문화체육 관광분야전시관 시설 데이터.csv")
+      d, idx = fc.knn(st["위도"], st["경도"], k=3)            # 역마다 가장 가까운 시설 3곳
+      fc.count_within(st["위도"], st["경도"], 500)             # 역마다 500m 안 시설 수
+      fc.nearest(st, k=1)                                      # 역 표 + 최근접 시설 속성 + 거리_m
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from 인코딩감지 import read_csv_auto
+
+EARTH_R = 6371000.0  # meters (거리_블록.py도 이 값을 씀)
+
+
+def unit_vectors(lat, lng) -> np.ndarray:
+    """위경도(도) → 단위 구 위 (x, y, z), shape (n, 3)"""
+    phi = np.radians(np.asarray(lat, dtype=float))
+    lam = np.radians(np.asarray(lng, dtype=float))
+    cphi = np.cos(phi)
+    return np.column_stack([cphi * np.cos(lam), cphi * np.sin(lam), np.sin(phi)])
+
+
+def chord_to_m(chord) -> np.ndarray:
+    return 2 * EARTH_R * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+def m_to_chord(meters) -> float:
+    return 2 * np.sin(np.minimum(meters, np.pi * EARTH_R) / (2 * EARTH_R))
+
+
+def _file_stat(path) -> dict:
+    p = Path(path).resolve()
+    st = p.stat()
+    return {"path": str(p), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class SpatialIndex:
+    """좌표가 있는 점들의 속성 표 + KD-tree (처음 질의할 때 만듦)"""
+
+    def __init__(self, points: pd.DataFrame, lat: str = "위도", lng: str = "경도", source=None):
+        for col in (lat, lng):
+            if col not in points.columns:
+                raise KeyError(f"'{col}' 컬럼이 없습니다. CSV를 확인하세요.")
+        points = points.copy()
+        points[lat] = pd.to_numeric(points[lat], errors="coerce")
+        points[lng] = pd.to_numeric(points[lng], errors="coerce")
+        self.points = points.dropna(subset=[lat, lng]).reset_index(drop=True)
+        self.lat, self.lng = lat, lng
+        self.source = source
+        self.xyz = unit_vectors(self.points[lat], self.points[lng])
+        self._tree = None
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            from scipy.spatial import cKDTree
+
+            self._tree = cKDTree(self.xyz)
+        return self._tree
+
+    @staticmethod
+    def _queries(lat, lng) -> np.ndarray:
+        q = unit_vectors(np.atleast_1d(lat), np.atleast_1d(lng))
+        if np.isnan(q).any():
+            raise ValueError("질의 좌표에 결측값이 있습니다. 위도/경도를 확인하세요.")
+        return q
+
+    # ---- 질의 ----
+    def knn(self, lat, lng, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """질의점마다 가까운 순 k개 → (거리_m (q, k), 점 위치 (q, k)), 점이 k개보다 적으면 있는 만큼"""
+        k = min(int(k), len(self))
+        if k < 1:
+            raise ValueError("색인에 점이 없거나 k가 1보다 작습니다.")
+        chord, idx = self.tree.query(self._queries(lat, lng), k=k)
+        return chord_to_m(chord).reshape(-1, k), np.asarray(idx).reshape(-1, k)
+
+    def pairs_within(self, lat, lng, radius_m: float) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        반경 안 (질의, 점) 쌍을 평평한 배열로 → (질의 번호, 점 위치, 거리_m, 질의별 시작 위치 (q+1,))
+        - 질의 순 → 거리 순(같으면 점 위치 순) 정렬, 질의 i의 쌍은 [start[i], start[i+1])
+        """
+        q = self._queries(lat, lng)
+        hits = self.tree.query_ball_point(q, m_to_chord(radius_m))
+        sizes = np.fromiter((len(h) for h in hits), dtype=np.int64, count=len(hits))
+        owner = np.repeat(np.arange(len(hits)), sizes)
+        hit = np.fromiter((i for h in hits for i in h), dtype=np.int64, count=int(sizes.sum()))
+        # 모든 (질의, 점) 쌍 거리를 한 번에 → 질의 순, 거리 순 정렬
+        d = chord_to_m(np.linalg.norm(self.xyz[hit] - q[owner], axis=1))
+        order = np.lexsort((hit, d, owner))
+        start = np.concatenate([[0], np.cumsum(sizes)])
+        return owner[order], hit[order], d[order], start
+
+    def within(self, lat, lng, radius_m: float) -> tuple[list, list]:
+        """질의점마다 반경 안 점들 → ([점 위치 배열], [거리_m 배열]) (각각 가까운 순)"""
+        _, hit, d, start = self.pairs_within(lat, lng, radius_m)
+        return np.split(hit, start[1:-1]), np.split(d, start[1:-1])
+
+    def count_within(self, lat, lng, radius_m: float) -> np.ndarray:
+        """질의점마다 반경 안 점 개수"""
+        return np.asarray(self.tree.query_ball_point(self._queries(lat, lng), m_to_chord(radius_m),
+                                                     return_length=True))
+
+    def nearest(self, query: pd.DataFrame, k: int = 1, lat: str = "위도", lng: str = "경도",
+                prefix: str = "최근접_") -> pd.DataFrame:
+        """
+        질의 표 + 가까운 순 k개 점의 속성 (질의 행 × k, 컬럼: 질의 컬럼 + 순위 + prefix 붙은 점 속성 + 거리_m)
+        - 좌표가 없는 질의 행은 제외
+        """
+        query = query.dropna(subset=[lat, lng]).reset_index(drop=True)
+        dist, idx = self.knn(query[lat], query[lng], k=k)
+        k = idx.shape[1]
+        out = query.iloc[np.repeat(np.arange(len(query)), k)].reset_index(drop=True)
+        out["순위"] = np.tile(np.arange(1, k + 1), len(query))
+        found = self.points.iloc[idx.ravel()].reset_index(drop=True).add_prefix(prefix)
+        out = pd.concat([out, found], axis=1)
+        out["거리_m"] = dist.ravel()
+        return out
+
+    # ---- 저장 / 읽기 ----
+    def save(self, path):
+        """path.npy (3차원 좌표, 읽을 때 메모리 맵) + path.parquet (속성 표) + path.json (원본 파일 정보)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path.with_suffix(".npy"), self.xyz)
+        self.points.to_parquet(path.with_suffix(".parquet"), index=False)
+        with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump({"lat": self.lat, "lng": self.lng, "source": self.source}, f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path) -> "SpatialIndex":
+        path = Path(path)
+        with open(path.with_suffix(".json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        idx = cls.__new__(cls)
+        idx.points = pd.read_parquet(path.with_suffix(".parquet"))
+        idx.lat, idx.lng = meta["lat"], meta["lng"]
+        idx.source = meta["source"]
+        idx.xyz = np.load(path.with_suffix(".npy"), mmap_mode="r")
+        idx._tree = None
+        return idx
+
+    @classmethod
+    def from_csv(cls, csv_path, lat: str = "위도", lng: str = "경도") -> "SpatialIndex":
+        """CSV(인코딩 자동 판별, 헤더 공백 제거) → 색인"""
+        df = read_csv_auto(csv_path)
+        df.columns = [str(c).strip() for c in df.columns]
+        return cls(df, lat=lat, lng=lng, source=_file_stat(csv_path))
+
+
+def load_or_build(index_path, csv_path, lat: str = "위도", lng: str = "경도") -> SpatialIndex:
+    """저장된 색인의 원본 파일 정보(경로/크기/수정시각)가 지금과 같으면 읽고, 아니면 CSV로 다시 만들어 저장"""
+    index_path = Path(index_path)
+    meta_path = index_path.with_suffix(".json")
+    if meta_path.exists():
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("source") == _file_stat(csv_path) and (meta["lat"], meta["lng"]) == (lat, lng):
+            return SpatialIndex.load(index_path)
+    idx = SpatialIndex.from_csv(csv_path, lat=lat, lng=lng)
+    idx.save(index_path)
+    return idx
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+날짜 차원 테이블 (수송일자 → 요일/월/계절/연도/평일휴일)
+- 원본 수송일자는 수백만 행이지만 서로 다른 값은 천 개 남짓
+  → 고유값만 한 번 파싱해서 작은 차원 테이블을 만들고,
+    행에는 정수 날짜키(YYYYMMDD)만 붙여 배열 인덱싱으로 속성을 가져옴
+- 입력은 원본 문자열("2023-07-01", "20230701", 20230701.0 …)과 datetime 모두 가능
+- 월 값("2021-07", "202107", "Jul-21", 월 숫자 7 …)도 같은 방식: 고유값만 파싱 → 월/연도/계절 범주형 컬럼
+"""
+
+import numpy as np
+import pandas as pd
+
+from 승하차_스키마 import 요일_CATS, 평일휴일_CATS
+
+# 월 → 계절 (계절별 분석 스크립트와 같은 라벨)
+SEASON_BY_MONTH = {
+    3: "봄(Spring)", 4: "봄(Spring)", 5: "봄(Spring)",
+    6: "여름(Summer)", 7: "여름(Summer)", 8: "여름(Summer)",
+    9: "가을(Autumn)", 10: "가을(Autumn)", 11: "가을(Autumn)",
+    12: "겨울(Winter)", 1: "겨울(Winter)", 2: "겨울(Winter)",
+}
+계절_CATS = pd.CategoricalDtype(
+    ["봄(Spring)", "여름(Summer)", "가을(Autumn)", "겨울(Winter)"], ordered=True
+)
+
+# 날짜키 결측값 (파싱 실패 / 빈 값)
+MISSING_KEY = -1
+
+# 월 값 형식 (위에서부터 차례로, 이미 파싱된 값은 건너뜀)
+_YEAR_MONTH = r"^(\d{4})\s*[-./년]?\s*(\d{1,2})(?:\s*월)?(?:[-./]?\d{1,2}(?:일)?)?$"   # 2021-07, 202107, 2021-07-01, 2021년 7월
+_NAME_YEAR = r"^([A-Za-z]{3})[A-Za-z]*[-\s./]?(\d{2}|\d{4})$"                          # Jul-21, July 2021
+_BARE_MONTH = r"^(\d{1,2})(?:\s*월)?$"                                                # 7, 07, 7월
+_MONTH_ABBR = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+def _parse_dates(values) -> pd.DatetimeIndex:
+    """고유값 배열 → 날짜 (숫자 외 문자 제거 + 8자리 맞춤, datetime은 그대로)"""
+    values = pd.Index(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.DatetimeIndex(values).normalize()
+    s = pd.Series(values.astype(str)).str.replace(r"\.0$", "", regex=True)
+    s = s.str.replace(r"\D", "", regex=True).str.zfill(8)
+    return pd.DatetimeIndex(pd.to_datetime(s, format="%Y%m%d", errors="coerce"))
+
+
+def date_dimension(dates) -> pd.DataFrame:
+    """날짜 목록(고유값) → 날짜키 순으로 정렬된 차원 테이블"""
+    dt = pd.DatetimeIndex(dates).dropna().unique().sort_values()
+    wd = dt.weekday
+    dim = pd.DataFrame({
+        "날짜키": (dt.year * 10000 + dt.month * 100 + dt.day).astype("int32"),
+        "수송일자": pd.array(dt.astype("datetime64[s]")),
+        "연도": pd.array(dt.year, dtype="Int16"),
+        "월": pd.Categorical(dt.strftime("%Y-%m")),
+        "weekday": pd.array(wd, dtype="Int8"),
+        "요일": pd.Categorical.from_codes(wd, dtype=요일_CATS),
+        "평일휴일": pd.Categorical.from_codes((wd >= 5).astype("int8"), dtype=평일휴일_CATS),
+        "계절": pd.Categorical(dt.month.map(SEASON_BY_MONTH), dtype=계절_CATS),
+    })
+    return dim
+
+
+def date_keys(raw) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    행 단위 수송일자 → (행별 날짜키 int32 배열, 차원 테이블)
+    - 파싱은 고유값에만 (pd.factorize), 행에는 코드 → 날짜키 배열 인덱싱만
+    - 파싱할 수 없는 값은 MISSING_KEY
+    """
+    codes, uniques = pd.factorize(pd.Series(raw), use_na_sentinel=True)
+    parsed = _parse_dates(uniques)
+    ukeys = np.where(
+        parsed.isna(), MISSING_KEY,
+        parsed.year * 10000 + parsed.month * 100 + parsed.day,
+    ).astype("int32")
+    keys = np.append(ukeys, np.int32(MISSING_KEY))[codes]   # 결측 코드(-1) → 마지막 = MISSING_KEY
+    return keys, date_dimension(parsed)
+
+
+def lookup(keys: np.ndarray, dim: pd.DataFrame, attrs) -> dict:
+    """날짜키 배열 → {속성: 행 단위 배열} (차원 테이블 위치를 찾아 take, 없는 키는 결측)"""
+    pos = pd.Index(dim["날짜키"]).get_indexer(keys)
+    return {a: dim[a].array.take(pos, allow_fill=True) for a in attrs}
+
+
+def attach_dates(df: pd.DataFrame, col: str = "수송일자", attrs=("요일",),
+                 keep_key: bool = False) -> pd.DataFrame:
+    """
+    df[col](원본 문자열 또는 datetime) → 날짜로 바꾸고 attrs 속성 컬럼 추가 (제자리 변환 후 반환)
+    - keep_key=True면 정수 '날짜키' 컬럼도 남김
+    """
+    keys, dim = date_keys(df[col])
+    found = lookup(keys, dim, ("수송일자",) + tuple(a for a in attrs if a != "수송일자"))
+    df[col] = found.pop("수송일자")
+    for a, v in found.items():
+        df[a] = v
+    if keep_key:
+        df["날짜키"] = keys
+    return df
+
+
+def _parse_periods(values) -> pd.DataFrame:
+    """고유값 배열 → 연도(없으면 결측) / 월 번호 (정규식은 열 전체에 한 번씩, 남은 값만 to_datetime)"""
+    s = pd.Series(pd.Index(values).astype(str)).str.strip().str.replace(r"\.0$", "", regex=True)
+    year = pd.Series(pd.NA, index=s.index, dtype="Int64")
+    month = pd.Series(pd.NA, index=s.index, dtype="Int64")
+
+    ym = s.str.extract(_YEAR_MONTH)
+    hit = ym[0].notna()
+    year[hit], month[hit] = ym.loc[hit, 0].astype("Int64"), ym.loc[hit, 1].astype("Int64")
+
+    ny = s[~hit].str.extract(_NAME_YEAR)
+    ny = ny[ny[0].notna()]
+    if len(ny):
+        m = ny[0].str.lower().map(_MONTH_ABBR).astype("Int64")
+        y = ny[1].astype("Int64")
+        y = y.where(y >= 100, y + 2000)
+        ok = m.notna()
+        year[ok[ok].index], month[ok[ok].index] = y[ok], m[ok]
+        hit[ok[ok].index] = True
+
+    bare = s[~hit].str.extract(_BARE_MONTH)[0].dropna()
+    month[bare.index] = bare.astype("Int64")
+    hit[bare.index] = True
+
+    rest = s[~hit & s.ne("") & ~s.str.lower().isin(["nan", "none", "<na>", "nat"])]
+    if len(rest):
+        dt = pd.to_datetime(rest, errors="coerce", format="mixed")
+        year[rest.index] = pd.array(dt.dt.year, dtype="Int64")
+        month[rest.index] = pd.array(dt.dt.month, dtype="Int64")
+
+    bad = ~month.between(1, 12).fillna(False)
+    year[bad], month[bad] = pd.NA, pd.NA
+    return pd.DataFrame({"연도": year, "월번호": month})
+
+
+def parse_periods(values) -> pd.DataFrame:
+    """
+    행 단위 월 값 → 월('YYYY-MM') / 연도 / 월번호 / 계절 범주형 컬럼 (values와 같은 인덱스)
+    - 파싱은 고유값에만 (pd.factorize), 행에는 코드로 take
+    - 연도가 없는 값(월 숫자만)은 월이 결측, 월번호/계절은 채움
+    """
+    raw = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(raw, use_na_sentinel=True)
+    p = _parse_periods(uniques)
+
+    ym = (p["연도"].astype(str).str.zfill(4) + "-" + p["월번호"].astype(str).str.zfill(2)).where(p["연도"].notna())
+    dims = {
+        "월": pd.Categorical(ym, categories=sorted(ym.dropna().unique()), ordered=True),
+        "연도": pd.Categorical(p["연도"], categories=sorted(p["연도"].dropna().unique()), ordered=True),
+        "월번호": pd.Categorical(p["월번호"], categories=range(1, 13), ordered=True),
+        "계절": pd.Categorical(p["월번호"].map(SEASON_BY_MONTH), dtype=계절_CATS),
+    }
+    return pd.DataFrame({k: v.take(codes, allow_fill=True) for k, v in dims.items()}, index=raw.index)
+
+
+def attach_periods(df: pd.DataFrame, col: str = "월", attrs=("월", "연도", "계절")) -> pd.DataFrame:
+    """df[col](여러 형식의 월 값) → attrs 범주형 컬럼 추가/교체 (제자리 변환 후 반환)"""
+    found = parse_periods(df[col])
+    for a in attrs:
+        df[a] = found[a]
+    return df
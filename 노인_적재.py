@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+서울교통공사 역별 일별 시간대별 노인 승하차 원본 적재
+- 원본 스냅샷 1개 → 표준 컬럼/요일/일일합계가 붙은 일 단위 테이블 (load_snapshot)
+- 일 단위 테이블 → 월 × 평일휴일 × 역 × 승하차 시간대 평균 요약 (monthly_summary)
+- 증분 적재 (ingest_incremental)
+  · 처리한 원본 파일을 매니페스트(해시, 행수, 날짜범위)에 기록
+  · 새 스냅샷(예: 2024년 파일)이 들어오면 그 파일만 정규화해서 Parquet 데이터셋에 추가
+  · 영향받은 월만 월별 요약에 다시 계산 (update_monthly_summary)
+  · 통합 CSV는 데이터셋에서 한 달씩 다시 내보냄 (export_merged_csv)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from 날짜_차원 import attach_dates
+from 승하차_스키마 import HOUR_COLS, apply_schema, read_summary
+from 시간대_컬럼 import resolve_columns
+from 인코딩감지 import read_csv_auto, verify_encoding
+from 승하차_저장소 import dataset_months, load_ridership, write_ridership
+
+# ===== 0) 최종 컬럼 순서 (요일 + 일일합계 포함, 고정) =====
+desired_order = [
+    "06-07시간대","06시간대이전","07-08시간대","08-09시간대","09-10시간대","10-11시간대",
+    "11-12시간대","12-13시간대","13-14시간대","14-15시간대","15-16시간대","16-17시간대",
+    "17-18시간대","18-19시간대","19-20시간대","20-21시간대","21-22시간대","22-23시간대",
+    "23-24시간대","24시간대이후",
+    "수송일자","요일","일일합계","승하차구분","역명","역번호","연번","날짜"
+]
+
+# 시간대 컬럼 목록 (합계 계산용)
+time_cols = list(HOUR_COLS)
+
+# 같은 날 같은 역·방향은 한 행만 (겹치는 스냅샷은 최신 스냅샷 우선)
+ROW_KEY = ["수송일자", "승하차구분", "역명", "역번호"]
+
+# ===== 1) 스냅샷 읽기 + 날짜/요일/일일합계 추가 + 컬럼 표준화/고정 =====
+def snapshot_date(f) -> pd.Timestamp:
+    """파일명 끝의 YYYYMMDD → 스냅샷 기준일('날짜')"""
+    return pd.to_datetime(Path(f).stem.split("_")[-1], format="%Y%m%d")
+
+
+def load_snapshot(f) -> pd.DataFrame:
+    df = read_csv_auto(f, dtype=str)   # dtype=str로 타입 혼선 방지
+    return apply_schema(normalize_snapshot(df, snapshot_date(f)))
+
+
+def iter_snapshot_chunks(f, chunksize: int = 200_000):
+    """
+    스냅샷을 chunksize 행씩 읽어 정규화된 조각으로 하나씩 반환 (파일 전체를 메모리에 올리지 않음)
+    - 인코딩은 파일 전체를 디코딩해 확인한 것 사용 (앞부분만 보고 정하면 뒤 조각에서 깨질 수 있음)
+    """
+    day = snapshot_date(f)
+    with pd.read_csv(f, dtype=str, encoding=verify_encoding(f), chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield apply_schema(normalize_snapshot(chunk, day))
+
+
+def normalize_snapshot(df: pd.DataFrame, day) -> pd.DataFrame:
+    """원본(문자열) 조각 → 표준 컬럼/수송일자/요일/일일합계가 붙은 조각"""
+    df["날짜"] = day
+
+    # 열 이름 표준화 (헤더 구성이 같은 파일/청크는 캐시된 매핑 재사용)
+    df = df.rename(columns=resolve_columns(df.columns).rename)
+
+    # 수송일자 → datetime → 요일 (고유 날짜만 파싱한 날짜 차원에서 가져옴)
+    if "수송일자" in df.columns:
+        attach_dates(df, attrs=("요일",))
+    else:
+        df["수송일자"] = pd.NaT
+        df["요일"] = pd.NA
+
+    # ---- 일일합계 계산 ----
+    # 시간대 컬럼이 누락돼도 안전하게 채우기
+    for col in time_cols:
+        if col not in df.columns:
+            df[col] = pd.NA
+    # 숫자 변환 후 합계(결측은 0으로 처리)
+    df[time_cols] = df[time_cols].apply(pd.to_numeric, errors="coerce")
+    df["일일합계"] = df[time_cols].sum(axis=1, skipna=True).fillna(0).astype("Int64")
+
+    # 누락 컬럼 보완 후 순서 강제
+    for col in desired_order:
+        if col not in df.columns:
+            df[col] = pd.NA
+    return df[desired_order]
+
+# ===== 2) 월 × 평일휴일 × 역 × 승하차 시간대 평균 =====
+def monthly_summary(merged: pd.DataFrame) -> pd.DataFrame:
+    tcols = [c for c in merged.columns if "시간대" in c]
+
+    # 필수 컬럼 체크
+    required_cols = ["수송일자", "승하차구분", "역명"]
+    missing = [c for c in required_cols if c not in merged.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼 누락: {missing}. 먼저 'merged'를 준비하세요. 누락: {missing}")
+
+    # 수송일자 날짜형 보정 + 파생: 월, 평일/휴일 (고유 날짜 단위 날짜 차원에서 가져옴)
+    df = attach_dates(merged.copy(), attrs=("월", "평일휴일"))
+
+    # 시간대 숫자화 (평균 계산용)
+    df[tcols] = df[tcols].apply(pd.to_numeric, errors="coerce")
+
+    # ---- 그룹 집계 ----
+    group_keys = ["월", "평일휴일", "역명", "승하차구분"]
+
+    # 시간대별 평균 (반올림 정수)
+    agg_mean = (df.groupby(group_keys, dropna=False, observed=True)[tcols]
+                  .mean().round(0).astype("Int64").reset_index())
+
+    # 집계일수
+    agg_cnt = (df.groupby(group_keys, dropna=False, observed=True)[tcols[0]]
+                 .count().reset_index(name="집계일수"))
+
+    # 병합
+    summary_all = pd.merge(agg_mean, agg_cnt, on=group_keys, how="left")
+
+    # ---- 평균 일일합계(행 합산) 추가 ----
+    summary_all["평균일일합계"] = summary_all[tcols].sum(axis=1).astype("Int64")
+
+    # 컬럼 순서 정리: 키 → 시간대 평균 → 평균일일합계 → 집계일수
+    return apply_schema(summary_all[group_keys + tcols + ["평균일일합계", "집계일수"]])
+
+# ===== 3) 증분 적재 =====
+def file_sha256(path, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(block):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path) -> dict:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest: dict, manifest_path):
+    manifest_path = Path(manifest_path)
+    tmp = manifest_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, manifest_path)
+
+
+def _merge_into_dataset(new: pd.DataFrame, dataset_root) -> list[str]:
+    """새 행이 닿는 (연도, 월) 파티션만 기존 행과 합쳐 다시 씀 → 영향받은 'YYYY-MM' 목록 반환"""
+    ym = new["수송일자"].dropna().dt.to_period("M").unique()
+    if len(ym) == 0:
+        return []
+    years = sorted({p.year for p in ym})
+    months = sorted({p.month for p in ym})
+
+    parts = []
+    if Path(dataset_root).exists():
+        old = load_ridership(dataset_root, years=years, months=months)
+        if not old.empty:
+            old_ym = pd.to_datetime(old["수송일자"]).dt.to_period("M")
+            # 같은 스냅샷을 다시 넣는 경우(파일 교체) 이전 적재분은 버림
+            keep = old_ym.isin(ym) & ~pd.to_datetime(old["날짜"]).isin(new["날짜"].unique())
+            parts.append(old.loc[keep, desired_order])
+    parts.append(new[desired_order])
+
+    combined = pd.concat(parts, ignore_index=True)
+    combined["수송일자"] = pd.to_datetime(combined["수송일자"])
+    combined["날짜"] = pd.to_datetime(combined["날짜"])
+    combined = (combined.sort_values("날짜", kind="stable")
+                        .drop_duplicates(ROW_KEY, keep="last"))
+
+    write_ridership(combined, dataset_root)
+    return sorted(str(p) for p in ym)
+
+
+def ingest_incremental(files, dataset_root, manifest_path) -> list[str]:
+    """
+    매니페스트에 없는(또는 내용이 바뀐) 원본만 정규화해서 Parquet 데이터셋에 추가
+    반환: 영향받은 월 목록 ['2024-01', ...]
+    """
+    manifest = load_manifest(manifest_path)
+    affected = set()
+
+    for f in files:
+        key = Path(f).name
+        digest = file_sha256(f)
+        if manifest.get(key, {}).get("sha256") == digest:
+            continue
+
+        df = load_snapshot(f)
+        affected.update(_merge_into_dataset(df, dataset_root))
+
+        dates = df["수송일자"].dropna()
+        manifest[key] = {
+            "sha256": digest,
+            "rows": int(len(df)),
+            "date_min": dates.min().strftime("%Y-%m-%d") if len(dates) else None,
+            "date_max": dates.max().strftime("%Y-%m-%d") if len(dates) else None,
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        save_manifest(manifest, manifest_path)
+        print(f"[적재] {key}: {len(df):,}행")
+
+    return sorted(affected)
+
+
+def update_monthly_summary(summary_csv, dataset_root, months=None) -> pd.DataFrame:
+    """
+    월별 요약 CSV에서 영향받은 월만 데이터셋에서 다시 계산해 교체
+    - 한 번에 한 달 파티션만 읽으므로 메모리는 한 달 분량으로 제한
+    - 기존 요약본도 공통 스키마로 읽어서 유지한 월과 다시 계산한 월의 표기가 같음
+    """
+    summary_csv = Path(summary_csv)
+    if summary_csv.exists():
+        # 새로 계산한 월과 같은 타입으로 읽음 (그냥 읽으면 시간대 값이 float → "12.0"으로 저장됨)
+        summary = read_summary(summary_csv)
+    else:
+        summary = None
+        # 요약본이 없으면 데이터셋 전체로 처음부터 생성
+        months = None
+
+    if months is None:
+        months = dataset_months(dataset_root)
+    if not months:
+        return summary
+
+    parts = []
+    for ym in months:
+        p = pd.Period(ym, freq="M")
+        day = load_ridership(dataset_root, columns=desired_order, years=[p.year], months=[p.month])
+        if not day.empty:
+            parts.append(monthly_summary(day))
+    if not parts:
+        return summary
+    fresh = pd.concat(parts, ignore_index=True)
+
+    if summary is not None:
+        summary = summary[~summary["월"].astype(str).isin(months)]
+        fresh = pd.concat([summary, fresh], ignore_index=True)
+
+    fresh = fresh.sort_values(["월", "평일휴일", "역명", "승하차구분"], kind="stable")
+    fresh.to_csv(summary_csv, index=False, encoding="utf-8-sig")
+    return fresh
+
+
+def export_merged_csv(dataset_root, merged_csv) -> int:
+    """
+    Parquet 데이터셋 → 통합 CSV (desired_order 컬럼, 한 달 파티션씩 이어 써서 메모리는 한 달 분량)
+    - 월 순서, 월 안에서는 수송일자 → 승하차구분 → 역번호 순 (적재 방식과 상관없이 같은 파일)
+    - 임시 파일에 쓴 뒤 교체, 데이터셋이 비어 있으면 기존 파일 유지
+    반환: 기록한 행수
+    """
+    merged_csv = Path(merged_csv)
+    tmp = merged_csv.with_name(f".tmp_{merged_csv.name}")
+    rows = 0
+    try:
+        for ym in dataset_months(dataset_root):
+            p = pd.Period(ym, freq="M")
+            day = load_ridership(dataset_root, columns=desired_order, years=[p.year], months=[p.month])
+            day = day.sort_values(["수송일자", "승하차구분", "역번호"], kind="stable")
+            if rows == 0:
+                day.to_csv(tmp, index=False, encoding="utf-8-sig")
+            else:
+                day.to_csv(tmp, index=False, header=False, mode="a", encoding="utf-8")
+            rows += len(day)
+        if rows == 0:
+            if tmp.exists():
+                tmp.unlink()
+            return 0
+        os.replace(tmp, merged_csv)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    return rows
+
+
+# ===== 4) 스트리밍 적재 (메모리 상한 고정) =====
+def _dedup_month(dataset_root, ym: str) -> int:
+    """한 달 파티션에서 ROW_KEY 중복을 증분 적재와 같은 규칙(최신 스냅샷 우선)으로 정리 → 남은 행수"""
+    p = pd.Period(ym, freq="M")
+    day = load_ridership(dataset_root, columns=desired_order, years=[p.year], months=[p.month])
+    if day.duplicated(ROW_KEY).any():
+        day = (day.sort_values("날짜", kind="stable")
+                  .drop_duplicates(ROW_KEY, keep="last"))
+        write_ridership(day, dataset_root)
+    return len(day)
+
+
+def ingest_streaming(files, dataset_root, merged_csv=None, chunksize: int = 200_000,
+                     workers: int = 2, manifest_path=None) -> int:
+    """
+    원본 스냅샷들을 chunksize 행씩 읽어 조각마다 바로 Parquet에 기록
+    - 메모리 사용량 ≈ workers × 조각 1개 (연도 수와 무관)
+    - 스냅샷 파일끼리는 서로 독립이라 workers 개수만큼 병렬로 읽음
+      (조각 파일 이름에 파일/조각 번호를 붙여 파티션 안 순서는 파일 순서로 고정)
+    - 다 쓴 뒤 한 달 파티션씩 ROW_KEY 중복 정리 (증분 적재와 같은 규칙)
+    - 통합 CSV는 정리된 데이터셋에서 export_merged_csv로 내보냄 (증분 적재와 같은 파일)
+    - manifest_path를 주면 적재한 원본을 매니페스트에 기록 (이후 증분 적재는 새 파일만)
+    - 전체 재생성용: dataset_root는 비우고 새로 씀
+    반환: 중복 정리 후 총 행수
+    """
+    dataset_root = Path(dataset_root)
+    if dataset_root.exists():
+        shutil.rmtree(dataset_root)
+    dataset_root.mkdir(parents=True)
+
+    def _one_file(idx_f):
+        idx, f = idx_f
+        n, lo, hi = 0, None, None
+        for k, chunk in enumerate(iter_snapshot_chunks(f, chunksize)):
+            write_ridership(chunk, dataset_root, existing="overwrite_or_ignore",
+                            basename=f"part-{idx:05d}-{k:05d}-{{i}}.parquet")
+            n += len(chunk)
+            dates = chunk["수송일자"].dropna()
+            if len(dates):
+                lo = dates.min() if lo is None else min(lo, dates.min())
+                hi = dates.max() if hi is None else max(hi, dates.max())
+        print(f"[적재] {Path(f).name}: {n:,}행")
+        return Path(f).name, {
+            "sha256": file_sha256(f) if manifest_path is not None else None,
+            "rows": n,
+            "date_min": lo.strftime("%Y-%m-%d") if lo is not None else None,
+            "date_max": hi.strftime("%Y-%m-%d") if hi is not None else None,
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        entries = list(pool.map(_one_file, enumerate(files)))
+
+    rows = sum(_dedup_month(dataset_root, ym) for ym in dataset_months(dataset_root))
+    if merged_csv is not None:
+        export_merged_csv(dataset_root, merged_csv)
+    if manifest_path is not None:
+        save_manifest(dict(entries), manifest_path)
+    return rows
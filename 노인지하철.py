@@ -1,5 +1,8 @@
-import requests
 import pandas as pd
+import pyarrow as pa
+
+from odcloud_수집 import PageCache, fetch_rows, write_pages
+from 시간대_컬럼 import parse_bin
 
 # 1) 본인 서비스키 (그대로 params에 넣으면 requests가 URL 인코딩 처리함)
 SERVICE_KEY = "wQP+Lc2rTuL73q4QDodUwoZ/it0NfKJPw1Rt1Fsc3Y4kOBUh7faLIBCKx+WS1AfH7UgqV8+vv80hRalWA/7XvA=="
@@ -16,10 +19,19 @@ UDDI_MAP = {
 # ✅ 실제 데이터 API Base URL (문서 URL 아님!)
 BASE = "https://api.odcloud.kr/api/15101985/v1"
 
-def fetch_od(date_key: str, per_page: int = 1000, max_pages: int | None = None) -> pd.DataFrame:
+
+def column_type(name: str):
+    """저장 타입: 시간대 인원수 컬럼은 정수 (표기가 달라도 시간대_컬럼으로 인식), 나머지는 문자열"""
+    return pa.int64() if parse_bin(name) is not None else None
+
+
+def fetch_od(date_key: str, per_page: int = 1000, max_pages: int | None = None,
+             workers: int = 8, use_cache: bool = True) -> pd.DataFrame:
     """
     서울교통공사_역별 일별 시간대별 노인 승하차인원 데이터 수집
     - date_key: 위 UDDI_MAP의 키 중 하나 ('20211231' 등)
+    - workers: 동시에 요청할 페이지 수 (1페이지의 totalCount로 전체 페이지 수를 알아낸 뒤 병렬 수집)
+    - use_cache: 받은 페이지를 odcloud_캐시/에 저장 → 끊겨도 이어받기, 다 받은 스냅샷은 요청 없이 재사용
     """
     if date_key not in UDDI_MAP:
         raise ValueError(f"date_key는 {list(UDDI_MAP.keys())} 중 하나여야 합니다.")
@@ -27,53 +39,34 @@ def fetch_od(date_key: str, per_page: int = 1000, max_pages: int | None = None)
     resource = UDDI_MAP[date_key]            # 예: 'uddi:560f9...'
     url = f"{BASE}/{resource}"               # 예: https://api.odcloud.kr/api/15101985/v1/uddi:560f9...
 
-    page = 1
-    all_rows = []
-
-    while True:
-        params = {
-            "serviceKey": SERVICE_KEY,
-            "page": page,
-            "perPage": per_page,
-            # "returnType": "JSON",  # 기본이 JSON
-            # 조건 예시) "cond[역명]": "서울역"
-        }
-
-        resp = requests.get(url, params=params, timeout=30)
-
-        # 방어적 체크: 200이 아니면 내용 출력
-        if resp.status_code != 200:
-            raise RuntimeError(f"[HTTP {resp.status_code}] {resp.text[:500]}")
-
-        # JSON 파싱
-        try:
-            payload = resp.json()
-        except Exception:
-            raise RuntimeError("JSON 파싱 실패:\n" + resp.text[:500])
-
-        data = payload.get("data", [])
-        current = payload.get("currentCount", 0)
-
-        if not data or current == 0:  # 더 이상 데이터 없음
-            break
-
-        all_rows.extend(data)
+    # 조건 예시) extra_params={"cond[역명]": "서울역"}
+    all_rows = fetch_rows(url, SERVICE_KEY, per_page=per_page, max_pages=max_pages, workers=workers,
+                          cache=PageCache() if use_cache else None)
+    return pd.DataFrame(all_rows)
 
-        if max_pages is not None and page >= max_pages:
-            break
 
-        page += 1
+def save_od(date_key: str, out_path, per_page: int = 1000, max_pages: int | None = None,
+            workers: int = 8, use_cache: bool = True) -> int:
+    """
+    fetch_od와 같은 데이터를 메모리에 모으지 않고 페이지 단위로 바로 파일에 저장 (.csv / .parquet)
+    - 인원수 컬럼은 정수, 나머지는 문자열로 저장 (column_type)
+    반환: 저장한 행 수
+    """
+    if date_key not in UDDI_MAP:
+        raise ValueError(f"date_key는 {list(UDDI_MAP.keys())} 중 하나여야 합니다.")
 
-    return pd.DataFrame(all_rows)
+    url = f"{BASE}/{UDDI_MAP[date_key]}"
+    return write_pages(url, SERVICE_KEY, out_path, per_page=per_page, max_pages=max_pages,
+                       workers=workers, types=column_type, cache=PageCache() if use_cache else None)
 
 
 if __name__ == "__main__":
     want = "20231231"  # 가져올 스냅샷 선택
-    df = fetch_od(want, per_page=1000, max_pages=None)
+    out_path = f"/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/노인_지하철_{want}.csv"
 
-    print("rows:", len(df))
-    print(df.head(5))
+    # 페이지 단위로 바로 저장 (전체를 DataFrame으로 모으지 않음)
+    rows = save_od(want, out_path, per_page=1000, max_pages=None)
 
-    out_path = f"/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/노인_지하철_{want}.csv"
-    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    print("rows:", rows)
+    print(pd.read_csv(out_path, nrows=5, encoding="utf-8-sig"))
     print(f"Saved: {out_path}")
@@ -2,7 +2,8 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import platform
-import re
+
+from 집계_백엔드 import yearly_window_sum
 
 
 
@@ -20,74 +21,27 @@ else:
 plt.rcParams["axes.unicode_minus"] = False
 
 # ==============================
-# 1) 데이터 로드
-# ==============================
-file_path = "/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/시간대별_월평균_평일휴일_역별_승하차_통합(반올림_행합계포함).csv"
-try:
-    df = pd.read_csv(file_path, encoding="utf-8")
-except UnicodeDecodeError:
-    df = pd.read_csv(file_path, encoding="cp949")
-
-# (선택) 분석 기간 제한
-# df = df[(df["월"] >= "2021-07") & (df["월"] <= "2023-12")].copy()
-
-# ==============================
-# 2) 시간대 컬럼 자동 인식
+# 1) 설정
 # ==============================
-time_cols = [c for c in df.columns if "시간대" in c]
-
-# "HH-HH시간대"만 인정 (예: "10-11시간대")
-rgx = re.compile(r"^(\d{2})-(\d{2})시간대$")
+rollup_dir = "/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/노인승하차_롤업"
+# 월 × 평일휴일 × 역 × 승하차 단위 롤업 테이블 (시간대 컬럼 = 월평균 하루치, 노인_지하철파일.py에서 생성)
 
-def parse_bin(col: str):
-    m = rgx.match(col)
-    if not m:
-        return None
-    s, e = int(m.group(1)), int(m.group(2))
-    return s, e
+# 집계 엔진: "pandas"(즉시 실행) 또는 "polars"(지연 실행 + 스트리밍), 결과는 같음
+ENGINE = "pandas"
 
-# ==============================
-# 3) 원하는 시간창(10:00~17:00)만 포함
+# 원하는 시간창(10:00~17:00)만 포함
 #    포함 규칙: 시작시각 >= 10, 종료시각 <= 17  -> 10-11, 11-12, ..., 16-17
-# ==============================
 WIN_START = 10
 WIN_END   = 17
 
-time_cols_10_17 = []
-for c in time_cols:
-    pr = parse_bin(c)
-    if pr is None:
-        continue
-    s, e = pr
-    if s >= WIN_START and e <= WIN_END:
-        time_cols_10_17.append(c)
-
-# 폴백: 표준 이름 세트
-fallback_10_17 = [f"{h:02d}-{h+1:02d}시간대" for h in range(10, 17)]
-if not time_cols_10_17:
-    time_cols_10_17 = [c for c in fallback_10_17 if c in df.columns]
-
-if not time_cols_10_17:
-    raise ValueError("10~17시 구간에 해당하는 시간대 컬럼을 찾지 못했습니다. 컬럼명을 확인해 주세요.")
+# (선택) 분석 기간 제한: 예) ("2021-07", "2023-12")
+MONTHS = None
 
 # ==============================
-# 4) 10~17시 합계 계산 (월평균 하루치 기준)
-# ==============================
-df["합계_10to17"] = df[time_cols_10_17].sum(axis=1)
-
+# 2) 연도별 평일/휴일 10~17시 합계 (월평균 하루치 기준) 및 100% 정규화
+#    (구간에 해당하는 시간대가 없으면 ValueError)
 # ==============================
-# 5) 연도 컬럼 생성 후, 연도별 평일/휴일 합계 및 100% 정규화
-# ==============================
-df["연도"] = pd.to_datetime(df["월"], errors="coerce").dt.year
-if df["연도"].isna().any():
-    # 파싱 실패분은 문자열 앞 4자리로 보정(가능한 경우)
-    y4 = df.loc[df["연도"].isna(), "월"].astype(str).str.extract(r"^(\d{4})")[0]
-    df.loc[df["연도"].isna(), "연도"] = pd.to_numeric(y4, errors="coerce")
-
-df = df.dropna(subset=["연도"]).copy()
-df["연도"] = df["연도"].astype(int)
-
-yearly_sum_10_17 = df.groupby(["연도", "평일휴일"])["합계_10to17"].sum().unstack(fill_value=0)
+yearly_sum_10_17 = yearly_window_sum(rollup_dir, WIN_START, WIN_END, engine=ENGINE, months=MONTHS)
 yearly_ratio_10_17 = yearly_sum_10_17.div(yearly_sum_10_17.sum(axis=1), axis=0) * 100
 
 # 정렬된 연도 인덱스 확보
@@ -99,7 +53,7 @@ weekday_vals = yearly_ratio_10_17["평일"].reindex(years, fill_value=0) if "평
 holiday_vals = yearly_ratio_10_17["휴일"].reindex(years, fill_value=0) if "휴일" in yearly_ratio_10_17.columns else pd.Series(0, index=years)
 
 # ==============================
-# 6) 시각화: 연도별 '좌우 나란히' 막대(그룹드 바)
+# 3) 시각화: 연도별 '좌우 나란히' 막대(그룹드 바)
 # ==============================
 x = np.arange(len(years))
 width = 0.38
@@ -130,8 +84,6 @@ plt.show()
 # ==============================
 # (선택) 연도별 '전 시간대 전체' 비율도 보고 싶다면
 # ==============================
-# time_cols_all = [c for c in df.columns if rgx.match(c)]  # 00-01 ~ 23-24 형태만
-# df["합계_ALL"] = df[time_cols_all].sum(axis=1)
-# yearly_sum_all = df.groupby(["연도","평일휴일"])["합계_ALL"].sum().unstack(fill_value=0)
+# yearly_sum_all = yearly_window_sum(rollup_dir, 0, 25, engine=ENGINE, months=MONTHS)   # 06시간대이전 ~ 24시간대이후 전체
 # yearly_ratio_all = yearly_sum_all.div(yearly_sum_all.sum(axis=1), axis=0) * 100
 # yearly_ratio_all.to_csv("연도별_평일휴일_비율_ALL(100퍼센트정규화).csv", encoding="utf-8-sig")
@@ -5,6 +5,8 @@ import seaborn as sns
 from matplotlib import font_manager
 import platform
 
+from 인코딩감지 import detect_encoding, read_csv_auto
+
 def setup_korean_font():
     """
     한글 폰트 설정
@@ -46,20 +48,9 @@ def load_and_analyze_data(file_path):
     CSV 파일 로드 및 기본 분석
     """
     try:
-        # 다양한 인코딩으로 시도
-        encodings = ['utf-8', 'utf-8-sig', 'euc-kr', 'cp949']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                print(f"✅ 파일 로드 성공 (인코딩: {encoding})")
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if df is None:
-            raise Exception("모든 인코딩 시도 실패")
+        # 앞부분만 보고 인코딩 판별 후 한 번만 파싱
+        df = read_csv_auto(file_path)
+        print(f"✅ 파일 로드 성공 (인코딩: {detect_encoding(file_path)})")
         
         print(f"📊 데이터 크기: {len(df)}행 × {len(df.columns)}열")
         print(f"📋 컬럼 목록: {list(df.columns)}")
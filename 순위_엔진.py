@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+역 순위(Top-K / Bottom-K) 엔진
+- 아무 기준(계절, 월, 연도, 평일휴일, 요일, 승하차구분 …)으로 묶은 모든 그룹의 순위를 한 번에 계산
+  · (그룹 × 역) 합계 → 그룹 코드 / 값 / 원래 순서로 한 번 정렬(np.lexsort) → 그룹 안 순번 = 순위
+  · 그룹마다 걸러서 정렬하는 반복문 없음
+- 측정값은 컬럼 이름 또는 시간창 (start, end) (예: (10, 17) → 10~17시 합계, 시간대 누적합 색인 사용)
+- 같은 질의(기준, 측정값, K, 방향, 필터)는 결과를 캐시해 두고 다시 계산하지 않음
+  예) r = Ranker(df)
+      r.top(["계절"], "평균일일합계", k=10, where={"평일휴일": "평일"})
+      r.top(["월", "평일휴일", "승하차구분"], (7, 10), k=5)      # 출근 시간대 Top5
+      r.bottom(["연도"], "평균일일합계", k=3)
+"""
+
+import numpy as np
+import pandas as pd
+
+from 시간대_누적 import HourPrefix
+
+
+class Ranker:
+    """고정된 표 하나에 대한 순위 질의 + 질의 단위 캐시"""
+
+    def __init__(self, df: pd.DataFrame, station: str = "역명"):
+        if station not in df.columns:
+            raise KeyError(f"'{station}' 컬럼이 없습니다. CSV를 확인하세요.")
+        self.df = df
+        self.station = station
+        self._cache = {}
+        self._prefix = None
+
+    # ---- 측정값 ----
+    def _measure(self, measure):
+        """컬럼 이름 → (이름, 값 Series, 원래 dtype 유지), 시간창 (start, end) → ('합계_HHtoHH', 시간창 합계)"""
+        if isinstance(measure, tuple):
+            if self._prefix is None:
+                self._prefix = HourPrefix.from_table(self.df, keys=[])
+            start, end = measure
+            return f"합계_{start}to{end}", pd.Series(self._prefix.window(start, end), index=self.df.index)
+        if measure not in self.df.columns:
+            raise KeyError(f"'{measure}' 컬럼이 없습니다. CSV를 확인하세요.")
+        return measure, pd.to_numeric(self.df[measure], errors="coerce")
+
+    def _mask(self, where) -> np.ndarray:
+        """where={"컬럼": 값 또는 [값, ...]} → 행 마스크"""
+        keep = np.ones(len(self.df), dtype=bool)
+        for col, val in (where or {}).items():
+            if col not in self.df.columns:
+                raise KeyError(f"'{col}' 컬럼이 없습니다. CSV를 확인하세요.")
+            vals = list(val) if isinstance(val, (list, tuple, set)) else [val]
+            keep &= self.df[col].isin(vals).to_numpy()
+        return keep
+
+    # ---- 순위 ----
+    def rank(self, by, measure, k: int | None = 10, ascending: bool = False, where=None,
+             agg: str = "sum") -> pd.DataFrame:
+        """
+        by 그룹마다 역 순위 → 컬럼: by + ['순위', 역명, 측정값]
+        - k: 그룹당 남길 개수 (None이면 전체 순위)
+        - ascending=False: 큰 값이 1위 (Top-K), True: 작은 값이 1위 (Bottom-K)
+        - 값이 같으면 먼저 나온 역이 앞 (안정 정렬), 결측값은 맨 뒤
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        sig = (tuple(by), measure, k, ascending, agg,
+               tuple(sorted((c, tuple(v) if isinstance(v, (list, tuple, set)) else v)
+                            for c, v in (where or {}).items())))
+        if sig in self._cache:
+            return self._cache[sig].copy()
+
+        name, values = self._measure(measure)
+        keep = self._mask(where)
+        keys = by + [self.station]
+        frame = self.df.loc[keep, keys].assign(**{name: values[keep].to_numpy()})
+
+        # (그룹 × 역) 집계
+        cells = (frame.groupby(keys, observed=True, sort=True)[name]
+                      .agg(agg).reset_index())
+
+        # 그룹 코드 / 값 / 원래 순서 → 한 번의 정렬로 모든 그룹 순위
+        if by:
+            gcode = cells.groupby(by, observed=True, sort=True).ngroup().to_numpy()
+        else:
+            gcode = np.zeros(len(cells), dtype=np.int64)
+        v = cells[name].to_numpy(dtype=float, na_value=np.nan)
+        v = np.where(np.isnan(v), np.inf, v if ascending else -v)
+        order = np.lexsort((np.arange(len(cells)), v, gcode))
+
+        ranked = cells.iloc[order].reset_index(drop=True)
+        g_sorted = gcode[order]
+        first = np.r_[0, np.flatnonzero(g_sorted[1:] != g_sorted[:-1]) + 1]
+        sizes = np.diff(np.r_[first, len(g_sorted)])
+        ranked["순위"] = np.arange(len(g_sorted)) - np.repeat(first, sizes) + 1
+        if k is not None:
+            ranked = ranked[ranked["순위"] <= k].reset_index(drop=True)
+
+        out = ranked[by + ["순위", self.station, name]]
+        self._cache[sig] = out
+        return out.copy()
+
+    def top(self, by, measure, k: int = 10, where=None, agg: str = "sum") -> pd.DataFrame:
+        return self.rank(by, measure, k=k, ascending=False, where=where, agg=agg)
+
+    def bottom(self, by, measure, k: int = 10, where=None, agg: str = "sum") -> pd.DataFrame:
+        return self.rank(by, measure, k=k, ascending=True, where=where, agg=agg)
+
+    def clear_cache(self):
+        self._cache.clear()
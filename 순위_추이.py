@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+역 순위 추이 (모든 역 × 모든 월의 순위를 한 번에)
+- 순위_엔진.Ranker로 (구분 × 월) 그룹 전체를 한 번에 순위 매김 (k 제한 없음)
+  → (구분, 역, 월) uint16 순위 배열 하나로 저장 (0 = 그 달 자료 없음)
+- 순위 변동성(표준편차, 평균 월간 변동)과 가장 많이 오르내린 역을 배열 연산으로 계산
+- 범프 차트는 저장된 순위 배열로만 그림 → 역 목록을 바꿔 그려도 다시 순위를 매기지 않음
+  예) t = RankTrajectory.from_table(df, "평균일일합계", by=["평일휴일", "승하차구분"])
+      t.matrix({"평일휴일": "평일", "승하차구분": "하차"})       # 역 × 월 순위표
+      t.movers({"평일휴일": "평일", "승하차구분": "하차"}, n=10)
+      t.bump(["서울역", "잠실"], {"평일휴일": "평일", "승하차구분": "하차"}, path="범프.png")
+"""
+
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from 순위_엔진 import Ranker
+
+NO_RANK = 0
+
+
+class RankTrajectory:
+    """구분 키 표 + 역 목록 + 월 목록 + (구분, 역, 월) 순위 배열"""
+
+    def __init__(self, groups: pd.DataFrame, stations, periods, ranks: np.ndarray,
+                 station: str = "역명", period: str = "월"):
+        self.groups = groups.reset_index(drop=True)
+        self.stations = pd.Index(stations, name=station)
+        self.periods = pd.Index(periods, name=period)
+        self.ranks = ranks
+        self.station = station
+        self.period = period
+
+    @classmethod
+    def from_table(cls, df: pd.DataFrame, measure, by=(), period: str = "월",
+                   station: str = "역명", agg: str = "sum") -> "RankTrajectory":
+        """
+        표 → 순위 추이 (by 구분 × period 마다 모든 역 순위, 그룹 정렬 한 번)
+        - measure: 컬럼 이름 또는 시간창 (start, end) (Ranker와 같음)
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if period not in df.columns:
+            raise KeyError(f"'{period}' 컬럼이 없습니다. CSV를 확인하세요.")
+        ranked = Ranker(df, station=station).rank(by + [period], measure, k=None, agg=agg)
+
+        stations = pd.Index(ranked[station].unique()).sort_values()
+        periods = pd.Index(ranked[period].unique()).sort_values()
+        if by:
+            g = ranked.groupby(by, observed=True, sort=True)
+            gcode = g.ngroup().to_numpy()
+            groups = g.size().reset_index()[by]
+        else:
+            gcode = np.zeros(len(ranked), dtype=np.int64)
+            groups = pd.DataFrame(index=range(1))
+
+        if len(stations) and ranked["순위"].max() > np.iinfo(np.uint16).max:
+            raise ValueError("역 수가 너무 많아 uint16 순위 배열에 담을 수 없습니다.")
+        ranks = np.full((len(groups), len(stations), len(periods)), NO_RANK, dtype=np.uint16)
+        ranks[gcode, stations.get_indexer(ranked[station]),
+              periods.get_indexer(ranked[period])] = ranked["순위"].to_numpy()
+        return cls(groups, stations, periods, ranks, station=station, period=period)
+
+    # ---- 조회 ----
+    def _group(self, group) -> int:
+        """group: {"평일휴일": "평일", ...} (구분이 하나뿐이면 None) → 구분 위치"""
+        if group is None:
+            if len(self.groups) != 1:
+                raise ValueError(f"구분이 여러 개입니다. group으로 하나를 고르세요: {list(self.groups.columns)}")
+            return 0
+        keep = np.ones(len(self.groups), dtype=bool)
+        for col, val in group.items():
+            if col not in self.groups.columns:
+                raise KeyError(f"'{col}'은(는) 구분 컬럼이 아닙니다: {list(self.groups.columns)}")
+            keep &= (self.groups[col].astype(str) == str(val)).to_numpy()
+        hit = np.flatnonzero(keep)
+        if len(hit) != 1:
+            raise KeyError(f"해당하는 구분을 하나로 찾지 못했습니다: {group}")
+        return int(hit[0])
+
+    def _float(self, group) -> np.ndarray:
+        """(역, 월) 순위, 자료 없는 칸은 NaN"""
+        r = self.ranks[self._group(group)].astype(float)
+        r[r == NO_RANK] = np.nan
+        return r
+
+    def matrix(self, group=None) -> pd.DataFrame:
+        """역 × 월 순위표 (자료 없는 칸은 결측)"""
+        r = self.ranks[self._group(group)]
+        out = pd.DataFrame(r, index=self.stations, columns=self.periods).astype("UInt16")
+        return out.mask(out == NO_RANK)
+
+    # ---- 변동 ----
+    def volatility(self, group=None) -> pd.DataFrame:
+        """역별 관측월수 / 평균순위 / 최고순위 / 최저순위 / 순위표준편차 / 평균변동(이웃한 달 사이 |순위 차|)"""
+        r = self._float(group)
+        seen = ~np.isnan(r)
+        n = seen.sum(axis=1)
+        step = np.abs(np.diff(r, axis=1))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)   # 자료 없는 역은 NaN
+            out = pd.DataFrame({
+                "관측월수": n,
+                "평균순위": np.nanmean(r, axis=1),
+                "최고순위": np.nanmin(r, axis=1),
+                "최저순위": np.nanmax(r, axis=1),
+                "순위표준편차": np.nanstd(r, axis=1),
+                "평균변동": np.nanmean(step, axis=1),
+            }, index=self.stations)
+        return out[n > 0].sort_values("순위표준편차", ascending=False, kind="stable")
+
+    def movers(self, group=None, start=None, end=None, n: int | None = 10) -> pd.DataFrame:
+        """
+        start 월 → end 월 순위 변화가 큰 역 (기본: 첫 달 → 마지막 달)
+        - 순위변동 = 시작순위 - 끝순위 (양수면 상승), 두 달 모두 자료 있는 역만
+        """
+        r = self._float(group)
+        i = 0 if start is None else self.periods.get_loc(start)
+        j = len(self.periods) - 1 if end is None else self.periods.get_loc(end)
+        out = pd.DataFrame({"시작순위": r[:, i], "끝순위": r[:, j]}, index=self.stations).dropna()
+        out["순위변동"] = out["시작순위"] - out["끝순위"]
+        out = out.astype("int64")
+        order = np.lexsort((np.arange(len(out)), -np.abs(out["순위변동"].to_numpy())))
+        out = out.iloc[order]
+        return out if n is None else out.head(n)
+
+    # ---- 범프 차트 ----
+    def bump(self, stations, group=None, ax=None, path=None, title: str | None = None):
+        """선택한 역들의 월별 순위 선 그래프 (1위가 위, 저장된 순위만 사용)"""
+        import matplotlib.pyplot as plt
+
+        r = self._float(group)
+        idx = self.stations.get_indexer(list(stations))
+        if (idx < 0).any():
+            missing = [s for s, k in zip(stations, idx) if k < 0]
+            raise KeyError(f"순위에 없는 역명입니다: {missing}")
+
+        if ax is None:
+            _, ax = plt.subplots(figsize=(12, 6))
+        x = np.arange(len(self.periods))
+        for name, k in zip(stations, idx):
+            line, = ax.plot(x, r[k], marker="o", linewidth=2, label=name)
+            last = np.flatnonzero(~np.isnan(r[k]))
+            if len(last):
+                ax.annotate(name, (x[last[-1]], r[k, last[-1]]), xytext=(5, 0),
+                            textcoords="offset points", va="center", color=line.get_color())
+        ax.set_xticks(x)
+        ax.set_xticklabels([str(p) for p in self.periods], rotation=45, ha="right")
+        ax.invert_yaxis()
+        ax.set_xlabel(self.period, fontsize=12)
+        ax.set_ylabel("순위", fontsize=12)
+        ax.set_title(title or "월별 역 순위 추이", fontsize=14)
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc="best")
+        if path is not None:
+            ax.figure.tight_layout()
+            ax.figure.savefig(path, dpi=200)
+        return ax
+
+    # ---- 저장 / 읽기 ----
+    def save(self, path):
+        """path.npz (순위 배열 + 역/월 목록) + path.parquet (구분 키)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path.with_suffix(".npz"), ranks=self.ranks,
+                 stations=self.stations.to_numpy(dtype=str), periods=self.periods.to_numpy(dtype=str),
+                 names=np.array([self.station, self.period]))
+        self.groups.to_parquet(path.with_suffix(".parquet"), index=False)
+
+    @classmethod
+    def load(cls, path) -> "RankTrajectory":
+        path = Path(path)
+        z = np.load(path.with_suffix(".npz"))
+        station, period = (str(v) for v in z["names"])
+        groups = pd.read_parquet(path.with_suffix(".parquet"))
+        if groups.columns.empty:        # 구분 없이 만든 경우 (구분 1개)
+            groups = pd.DataFrame(index=range(1))
+        return cls(groups, z["stations"].tolist(),
+                   z["periods"].tolist(), z["ranks"], station=station, period=period)
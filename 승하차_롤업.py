@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+노인 승하차 롤업 큐브 (한 번 읽고 여러 단위로 집계)
+- 일 단위 테이블을 한 번만 훑어서 가장 작은 셀(월 × 요일 × 역 × 승하차)의 시간대별 합계/일수를 구함
+  · Parquet 데이터셋이면 월 파티션씩 읽으므로 메모리는 한 달 분량
+- 셀마다 합칠 수 있는 집계 상태만 저장: 합계 / 일수 / 제곱합 / 최소 / 최대
+  → 더 큰 단위(분기, 계절, 연도, 임의 월 범위 …)는 상태를 합쳐서 정확히 계산 (원본 재조회 없음)
+  · 합계·일수·제곱합은 더하고, 최소는 최소끼리, 최대는 최대끼리
+  · 평균 = 합계 / 일수, 표준편차 = √((제곱합 − 합계²/일수) / (일수 − 1))
+  · 반올림은 보여줄 때만 (present) → 반올림된 평균을 다시 더하는 오차가 없음
+- 표준 단위: 기간 월 / 계절 / 연도   × 구분 평일휴일 / 요일   × 역명 × 승하차구분
+- 단위별 결과를 출력 폴더에 Parquet으로 저장 → 분석 스크립트는 load_rollup으로 읽기만
+  예) load_rollup(ROLLUP_DIR, "월", "평일휴일")  ==  월별 요약(반올림 전)
+      present(derive_grain(base, ["분기", "평일휴일", "역명", "승하차구분"]))  → 분기 요약
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from 날짜_차원 import attach_dates, parse_periods
+from 승하차_스키마 import HOUR_COLS, 요일_CATS, 평일휴일_CATS
+from 승하차_저장소 import dataset_months, load_ridership
+
+PERIODS = ("월", "계절", "연도")
+DAYTYPES = ("평일휴일", "요일")
+
+# 가장 작은 셀의 키 (연도/계절/평일휴일은 월/요일에서 정해지는 속성이라 셀 수는 늘지 않음)
+BASE_KEYS = ["월", "연도", "계절", "요일", "평일휴일", "역명", "승하차구분"]
+BASE_NAME = "기본셀"
+
+
+# 집계 상태 → 합치는 방법
+STATES = {"합계": "sum", "일수": "sum", "제곱합": "sum", "최소": "min", "최대": "max"}
+
+
+def sum_col(h: str) -> str:
+    return f"{h}_합계"
+
+
+def cnt_col(h: str) -> str:
+    return f"{h}_일수"
+
+
+def state_col(h: str, state: str) -> str:
+    return f"{h}_{state}"
+
+
+# ===== 1) 일 단위 → 기본셀 =====
+def rollup_base(merged: pd.DataFrame) -> pd.DataFrame:
+    """일 단위 테이블 → 기본셀 (시간대별 합계/일수/제곱합/최소/최대 + 일일합계 합계 + 집계일수)"""
+    required = ["수송일자", "승하차구분", "역명"]
+    missing = [c for c in required if c not in merged.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼 누락: {missing}")
+
+    hours = [h for h in HOUR_COLS if h in merged.columns]
+    df = attach_dates(merged[required + hours].copy(), attrs=("월", "연도", "계절", "요일", "평일휴일"))
+
+    # 제곱합용 컬럼 (65535² 도 int64 범위 안)
+    sq_cols = [state_col(h, "제곱합") for h in hours]
+    df[sq_cols] = df[hours].astype("Int64") ** 2
+
+    g = df.groupby(BASE_KEYS, dropna=False, observed=True, sort=False)
+    sums = g[hours].sum(min_count=0).astype("Int64")
+    parts = [
+        sums.rename(columns=sum_col),
+        g[hours].count().astype("Int64").rename(columns=cnt_col),
+        g[sq_cols].sum(min_count=0).astype("Int64"),
+        g[hours].min().astype("Int64").rename(columns=lambda h: state_col(h, "최소")),
+        g[hours].max().astype("Int64").rename(columns=lambda h: state_col(h, "최대")),
+    ]
+    base = pd.concat(parts, axis=1)
+    base["일일합계_합계"] = sums.sum(axis=1).astype("Int64")
+    base["집계일수"] = g.size().astype("Int64")
+    return base.reset_index()
+
+
+def rollup_base_from_dataset(dataset_root, months=None) -> pd.DataFrame:
+    """Parquet 데이터셋 → 기본셀 (월 파티션씩 읽어서 이어 붙임, 월이 키에 있으므로 합칠 필요 없음)"""
+    months = months if months is not None else dataset_months(dataset_root)
+    parts = []
+    for ym in months:
+        p = pd.Period(ym, freq="M")
+        day = load_ridership(dataset_root, columns=["수송일자", "승하차구분", "역명"] + HOUR_COLS,
+                             years=[p.year], months=[p.month])
+        if not day.empty:
+            parts.append(rollup_base(day))
+    if not parts:
+        raise ValueError(f"데이터셋에 읽을 월이 없습니다: {dataset_root}")
+    return pd.concat(parts, ignore_index=True)
+
+
+# ===== 2) 기본셀 → 원하는 단위 =====
+def state_rules(table: pd.DataFrame) -> dict:
+    """상태 컬럼 → 합치는 방법 (기본셀과 단위 테이블 모두, 평균 등 파생 컬럼은 제외)"""
+    rules = {}
+    for c in table.columns:
+        state = c.rsplit("_", 1)[-1] if "_" in c else None
+        if state in STATES:
+            rules[c] = STATES[state]
+        elif c == "집계일수":
+            rules[c] = "sum"
+    return rules
+
+
+def with_period(base: pd.DataFrame, keys) -> pd.DataFrame:
+    """
+    keys에 있는데 테이블에 없는 기간/구분 속성을 남아 있는 키에서 파생 (단위 테이블에는 키만 저장되므로)
+    - 분기('2023-Q3') / 연도 / 계절 ← 월
+    - 평일휴일 ← 요일 (토·일 = 휴일, 날짜 차원과 같은 규칙)
+    - 만들 수 없으면 KeyError (예: 계절 단위 테이블 → 연도)
+    """
+    need = [k for k in keys if k not in base.columns]
+    if not need:
+        return base
+    extra = {}
+    if "월" in base.columns:
+        if "분기" in need:
+            extra["분기"] = (pd.PeriodIndex(base["월"].astype(str), freq="M")
+                             .asfreq("Q").strftime("%Y-Q%q"))
+        if "연도" in need or "계절" in need:
+            p = parse_periods(base["월"].astype(str))
+            if "연도" in need:
+                extra["연도"] = p["연도"].astype("Int64").astype("Int16")
+            if "계절" in need:
+                extra["계절"] = p["계절"]
+    if "평일휴일" in need and "요일" in base.columns:
+        wd = base["요일"].astype(요일_CATS).cat.codes.to_numpy()
+        extra["평일휴일"] = pd.Categorical.from_codes(np.where(wd < 0, -1, wd >= 5).astype("int8"),
+                                                   dtype=평일휴일_CATS)
+    missing = [k for k in need if k not in extra]
+    if missing:
+        raise KeyError(f"{missing}을(를) 이 테이블의 키에서 만들 수 없습니다. "
+                       f"기본셀이나 더 작은 단위 테이블에서 묶으세요.")
+    return base.assign(**extra)
+
+
+def select_months(base: pd.DataFrame, months) -> pd.DataFrame:
+    """months: ['2023-01', ...] 목록 또는 (시작월, 끝월) 포함 구간"""
+    m = base["월"].astype(str)
+    if isinstance(months, tuple) and len(months) == 2:
+        return base[(m >= months[0]) & (m <= months[1])]
+    return base[m.isin(list(months))]
+
+
+def _finish(agg: pd.DataFrame) -> pd.DataFrame:
+    """합계/일수 → 시간대별 평균 + 평균일일합계 (반올림 없음)"""
+    hours = [h for h in HOUR_COLS if sum_col(h) in agg.columns]
+    means = {h: agg[sum_col(h)].astype("Float64") / agg[cnt_col(h)].replace(0, pd.NA) for h in hours}
+    agg = pd.concat([agg, pd.DataFrame(means, index=agg.index)], axis=1)
+    agg["평균일일합계"] = agg[hours].sum(axis=1, min_count=1)
+    return agg
+
+
+def derive_grain(base: pd.DataFrame, keys, months=None) -> pd.DataFrame:
+    """
+    기본셀(또는 더 작은 단위 테이블)의 상태를 keys 단위로 합침 → 상태 + 평균
+    - keys: 예) ["분기", "평일휴일", "역명", "승하차구분"], ["계절", "역명"]
+    - months: 특정 월 목록 / (시작월, 끝월) 구간만 합치기
+    """
+    keys = list(keys)
+    if months is not None:
+        base = select_months(base, months)
+    base = with_period(base, keys)
+    agg = (base.groupby(keys, dropna=False, observed=True)
+               .agg(state_rules(base)).reset_index())
+    return _finish(agg)
+
+
+def std_table(agg: pd.DataFrame) -> pd.DataFrame:
+    """상태 → 시간대별 표본 표준편차 (일수 1 이하는 결측)"""
+    out = {}
+    for h in HOUR_COLS:
+        if state_col(h, "제곱합") not in agg.columns:
+            continue
+        n = agg[cnt_col(h)].astype("Float64")
+        s = agg[sum_col(h)].astype("Float64")
+        var = (agg[state_col(h, "제곱합")].astype("Float64") - s * s / n) / (n - 1)
+        var = var.where(n > 1).clip(lower=0)
+        out[h] = np.sqrt(var)
+    return pd.DataFrame(out, index=agg.index)
+
+
+def present(agg: pd.DataFrame, digits: int = 0) -> pd.DataFrame:
+    """
+    보여주기용 표: 키 + 시간대 평균(반올림) + 평균일일합계(반올림된 시간대의 합) + 집계일수
+    - digits=0이면 월별 요약 CSV와 같은 형식 (정수)
+    """
+    hours = [h for h in HOUR_COLS if h in agg.columns]
+    keys = [c for c in agg.columns if c not in state_rules(agg) and c not in hours and c != "평균일일합계"]
+    out = agg[keys].copy()
+    rounded = agg[hours].round(digits)
+    out[hours] = rounded.astype("Int64") if digits == 0 else rounded
+    out["평균일일합계"] = out[hours].sum(axis=1)
+    out["집계일수"] = agg[cnt_col(hours[0])]
+    return out
+
+
+def grain_name(period: str, daytype: str) -> str:
+    return f"{period}_{daytype}"
+
+
+def grain_keys(period: str, daytype: str) -> list[str]:
+    if period not in PERIODS or daytype not in DAYTYPES:
+        raise ValueError(f"period는 {PERIODS}, daytype은 {DAYTYPES} 중 하나여야 합니다.")
+    return [period, daytype, "역명", "승하차구분"]
+
+
+# ===== 3) 저장 / 읽기 =====
+def build_rollup(source, out_dir, months=None) -> dict:
+    """
+    source(일 단위 DataFrame 또는 Parquet 데이터셋 경로) → 표준 단위 전체를 out_dir에 저장
+    - months: (데이터셋일 때) 다시 계산할 월 ['2024-01', ...]
+              저장된 기본셀에서 그 월만 교체하고 나머지 단위는 기본셀로 다시 만듦
+    반환: {단위명: 저장 경로}
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    base_path = out_dir / f"{BASE_NAME}.parquet"
+
+    if isinstance(source, pd.DataFrame):
+        base = rollup_base(source)
+    elif months is not None and base_path.exists():
+        old = pd.read_parquet(base_path)
+        old = old[~old["월"].astype(str).isin(months)]
+        base = pd.concat([old, rollup_base_from_dataset(source, months)], ignore_index=True)
+    else:
+        base = rollup_base_from_dataset(source)
+
+    saved = {}
+    base.to_parquet(base_path, index=False)
+    saved[BASE_NAME] = base_path
+    for period in PERIODS:
+        for daytype in DAYTYPES:
+            name = grain_name(period, daytype)
+            path = out_dir / f"{name}.parquet"
+            derive_grain(base, grain_keys(period, daytype)).to_parquet(path, index=False)
+            saved[name] = path
+    return saved
+
+
+def load_rollup(out_dir, period: str = "월", daytype: str = "평일휴일", columns=None) -> pd.DataFrame:
+    """저장된 단위 테이블 읽기 (예: load_rollup(ROLLUP_DIR, "연도", "요일"))"""
+    grain_keys(period, daytype)   # 인자 확인
+    path = Path(out_dir) / f"{grain_name(period, daytype)}.parquet"
+    if not path.exists():
+        raise FileNotFoundError(f"롤업 테이블이 없습니다: {path} (build_rollup을 먼저 실행하세요)")
+    return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+노인 승하차 테이블 공통 스키마 (타입 레지스트리)
+- 일 단위 통합 테이블(merged)과 월별 요약 테이블에 같은 타입을 적용
+  · 시간대 인원수: UInt16 (값이 65535를 넘는 열만 UInt32로 자동 확장)
+  · 일일합계/평균일일합계: UInt32, 집계일수: UInt8
+  · 승하차구분/평일휴일/요일: 고정 범주(category), 역명/월: 데이터에서 나온 범주
+  · 수송일자/날짜: 일 단위로 자른 datetime64[s]
+    (pandas가 datetime64[D]를 지원하지 않아 지원되는 가장 작은 단위인 초 + 자정으로 고정)
+- 결측은 nullable 정수(UInt*)의 마스크로 유지 → 평균/집계일수 계산 결과는 기존과 동일
+"""
+
+import numpy as np
+import pandas as pd
+
+from 인코딩감지 import read_csv_auto
+
+# ===== 0) 컬럼 정의 =====
+HOUR_COLS = [
+    "06-07시간대","06시간대이전","07-08시간대","08-09시간대","09-10시간대","10-11시간대",
+    "11-12시간대","12-13시간대","13-14시간대","14-15시간대","15-16시간대","16-17시간대",
+    "17-18시간대","18-19시간대","19-20시간대","20-21시간대","21-22시간대","22-23시간대",
+    "23-24시간대","24시간대이후"
+]
+
+# 범주 고정 집합
+승하차구분_CATS = pd.CategoricalDtype(["승차", "하차"])
+평일휴일_CATS = pd.CategoricalDtype(["평일", "휴일"])
+요일_CATS = pd.CategoricalDtype(
+    ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"], ordered=True
+)
+
+# 컬럼명 → 타입 (시간대 컬럼은 HOUR_DTYPE)
+HOUR_DTYPE = "UInt16"
+COLUMN_TYPES = {
+    "일일합계": "UInt32",
+    "평균일일합계": "UInt32",
+    "집계일수": "UInt8",
+    "승하차구분": 승하차구분_CATS,
+    "평일휴일": 평일휴일_CATS,
+    "요일": 요일_CATS,
+    "역명": "category",
+    "월": "category",
+    "수송일자": "date",
+    "날짜": "date",
+}
+
+_UINT_MAX = {"UInt8": 255, "UInt16": 65535, "UInt32": 4294967295}
+_WIDER = {"UInt8": "UInt16", "UInt16": "UInt32", "UInt32": "UInt64"}
+
+
+def _to_uint(s: pd.Series, dtype: str) -> pd.Series:
+    """숫자화 → 반올림 → 부호 없는 정수 (최댓값을 넘으면 한 단계 넓은 타입)"""
+    v = pd.to_numeric(s, errors="coerce")
+    if not pd.api.types.is_integer_dtype(v):
+        v = v.round(0)
+    vmax = v.max()
+    while dtype in _UINT_MAX and pd.notna(vmax) and vmax > _UINT_MAX[dtype]:
+        dtype = _WIDER[dtype]
+    if pd.notna(v.min()) and v.min() < 0:
+        raise ValueError(f"음수 인원수가 있습니다: {s.name} (최솟값 {v.min()})")
+    return v.astype(dtype)
+
+
+def _to_date(s: pd.Series) -> pd.Series:
+    if not np.issubdtype(s.dtype, np.datetime64):
+        s = pd.to_datetime(s, errors="coerce")
+    return s.dt.normalize().astype("datetime64[s]")
+
+
+def _to_fixed_category(s: pd.Series, dtype: pd.CategoricalDtype) -> pd.Series:
+    """앞뒤 공백 제거 → 고정 범주 (범주 밖의 값이 있으면 결측으로 바꾸지 않고 ValueError)"""
+    if s.dtype == dtype:
+        return s
+    v = s.astype("string").str.strip()
+    bad = v.notna() & ~v.isin(dtype.categories)
+    if bad.any():
+        values = list(v[bad].unique()[:10])
+        raise ValueError(f"'{s.name}' 컬럼에 정해진 값 {list(dtype.categories)} 밖의 값이 "
+                         f"{int(bad.sum())}행 있습니다: {values}. 원본 표기를 확인하세요.")
+    return v.astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, skip=()) -> pd.DataFrame:
+    """
+    있는 컬럼에만 공통 타입 적용 (제자리 변환 후 같은 DataFrame 반환)
+    - skip: 이름은 같지만 의미가 다른 컬럼 (예: Parquet 파티션의 정수 '월')
+    - 승하차구분/평일휴일/요일은 공백만 정리하고, 정해진 값 밖의 표기가 있으면 ValueError
+      (결측으로 바꾸면 observed=True 집계에서 행이 조용히 빠짐)
+    """
+    for col in df.columns:
+        if col in skip:
+            continue
+        if col in HOUR_COLS:
+            df[col] = _to_uint(df[col], HOUR_DTYPE)
+            continue
+        dtype = COLUMN_TYPES.get(col)
+        if dtype is None:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            # CategoricalDtype == "category" 도 참이므로 고정 범주를 먼저 확인
+            df[col] = _to_fixed_category(df[col], dtype)
+        elif dtype == "date":
+            df[col] = _to_date(df[col])
+        elif dtype.startswith("UInt"):
+            df[col] = _to_uint(df[col], dtype)
+        elif dtype == "category":
+            df[col] = df[col].astype("category")
+    return df
+
+
+def read_summary(path) -> pd.DataFrame:
+    """월별 요약 CSV 로드 + 공통 스키마 적용"""
+    return apply_schema(read_csv_auto(path))
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+노인 승하차 통합 테이블 컬럼형(Parquet) 저장소
+- 저장: 연도 / 월 / 승하차구분 기준 hive 파티션 Parquet 데이터셋
+        (예: 출력/노인승하차_parquet/연도=2023/월=7/승하차구분=하차/part-0.parquet)
+- 읽기: 필요한 컬럼만(컬럼 프로젝션), 필요한 파티션만(파티션 프루닝) 읽어서 DataFrame 반환
+  예) 2023년 평일 하차 10~17시
+      load_ridership(ROOT, columns=["수송일자","역명","10-11시간대",...],
+                     years=[2023], directions=["하차"], weekday_only=True)
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from 승하차_스키마 import HOUR_COLS, apply_schema
+
+# 파티션 컬럼 (순서 = 폴더 계층)
+PARTITION_COLS = ["연도", "월", "승하차구분"]
+
+PARTITION_SCHEMA = pa.schema([
+    ("연도", pa.int16()),
+    ("월", pa.int8()),
+    ("승하차구분", pa.string()),
+])
+
+WEEKDAYS_KO = ["월요일", "화요일", "수요일", "목요일", "금요일"]
+
+
+def _typed_frame(merged: pd.DataFrame) -> pd.DataFrame:
+    """
+    저장 전 타입 정리 (공통 스키마 적용 후)
+    - 인원수는 파일마다 같은 타입이 되도록 UInt32로 고정
+      (Parquet은 정수를 비트패킹하므로 디스크 크기 차이는 거의 없음, 읽을 때 다시 UInt16으로)
+    - 범주형은 파티션 키와 맞추기 위해 문자열로
+    """
+    df = apply_schema(merged.copy(), skip=PARTITION_COLS[:2])
+
+    count_cols = [c for c in df.columns if c in HOUR_COLS or c == "일일합계"]
+    df[count_cols] = df[count_cols].astype("UInt32")
+
+    for c in ["요일", "승하차구분", "역명", "역번호", "연번"]:
+        if c in df.columns:
+            df[c] = df[c].astype("string")
+
+    # 파티션 키 파생
+    df["연도"] = df["수송일자"].dt.year.astype("Int16")
+    df["월"] = df["수송일자"].dt.month.astype("Int8")
+    return df
+
+
+def write_ridership(merged: pd.DataFrame, root, existing: str = "delete_matching",
+                    basename: str = "part-{i}.parquet") -> Path:
+    """
+    통합 테이블(merged)을 연도/월/승하차구분 파티션 Parquet 데이터셋으로 저장
+    - existing="delete_matching": 같은 파티션만 교체 (다른 연도/월은 그대로 유지)
+    - existing="overwrite_or_ignore" + 청크마다 다른 basename: 같은 파티션에 파일 추가 (스트리밍 적재용)
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(_typed_frame(merged), preserve_index=False)
+    ds.write_dataset(
+        table,
+        base_dir=str(root),
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        existing_data_behavior=existing,
+        basename_template=basename,
+    )
+    return root
+
+
+def open_ridership(root) -> ds.Dataset:
+    """파티션 스키마를 붙여 데이터셋 열기 (실제 데이터는 아직 읽지 않음)"""
+    return ds.dataset(
+        str(root),
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+    )
+
+
+def dataset_months(root) -> list[str]:
+    """데이터셋에 들어 있는 월 목록 ['2021-07', ...] (파티션 경로만 보고 판단, 데이터는 읽지 않음)"""
+    found = set()
+    for frag in open_ridership(root).get_fragments():
+        keys = ds.get_partition_keys(frag.partition_expression)
+        if keys.get("연도") is not None and keys.get("월") is not None:
+            found.add(f"{keys['연도']:04d}-{keys['월']:02d}")
+    return sorted(found)
+
+
+def load_ridership(root, columns=None, years=None, months=None, directions=None,
+                   weekday_only: bool = False, filter=None) -> pd.DataFrame:
+    """
+    Parquet 데이터셋 조회
+    - columns: 읽을 컬럼 목록 (None이면 전체)
+    - years / months / directions: 파티션 필터 (해당 폴더만 읽음)
+    - weekday_only: 요일 기준 평일(월~금)만
+    - filter: 추가 pyarrow 표현식 (예: pc.field("역명") == "서울역")
+    """
+    dataset = open_ridership(root)
+
+    expr = None
+
+    def _and(e):
+        nonlocal expr
+        expr = e if expr is None else (expr & e)
+
+    if years is not None:
+        _and(pc.field("연도").isin([int(y) for y in years]))
+    if months is not None:
+        _and(pc.field("월").isin([int(m) for m in months]))
+    if directions is not None:
+        _and(pc.field("승하차구분").isin(list(directions)))
+    if weekday_only:
+        _and(pc.field("요일").isin(WEEKDAYS_KO))
+    if filter is not None:
+        _and(filter)
+
+    table = dataset.to_table(columns=list(columns) if columns is not None else None, filter=expr)
+    return apply_schema(table.to_pandas(), skip=PARTITION_COLS[:2])
+
+
+if __name__ == "__main__":
+    ROOT = Path("/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/노인승하차_parquet")
+    window_cols = [f"{h:02d}-{h+1:02d}시간대" for h in range(10, 17)]
+    df = load_ridership(ROOT, columns=["수송일자", "역명"] + window_cols,
+                        years=[2023], directions=["하차"], weekday_only=True)
+    print("rows:", len(df))
+    print(df.head())
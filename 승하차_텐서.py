@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+노인 승하차 밀집 텐서 (역 × 일 × 시간대 × 승하차)
+- 일 단위 테이블 → shape (역, 일, 시간대, 승하차) 의 uint16 배열 (값이 65535를 넘으면 uint32)
+  · 역: 역명 가나다순, 일: 시작일부터 하루 간격(빈 날 포함), 시간대: 시작 시각 순, 승하차: 승차/하차
+  · 같은 역명에 역번호가 여럿이면(환승역) 합산 (롤업 테이블과 같은 기준)
+  · 관측 여부는 (역, 일, 승하차) bool 배열로 따로 저장 → 0명과 자료 없음을 구분
+- .npy 로 저장하고 읽을 때는 메모리 맵(np.load(mmap_mode="r")) → CSV 파싱 없이 즉시 열림
+- 차원 조회표(역명/날짜/시간대/승하차구분)는 _dims.json 에 저장
+  예) t = open_tensor(TENSOR_DIR)
+      t.window_sum(10, 17)[:, t.weekday_mask(), :]     # 평일 10~17시 (역, 일, 승하차)
+      t.profile("서울역", "하차")                        # 시간대별 평균 하루
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from 날짜_차원 import date_dimension
+from 시간대_컬럼 import hour_bins
+from 승하차_스키마 import HOUR_COLS
+from 승하차_저장소 import dataset_months, load_ridership
+
+DIRECTIONS = ["승차", "하차"]
+DATA_NAME = "tensor.npy"
+MASK_NAME = "observed.npy"
+DIMS_NAME = "_dims.json"
+
+# 시간대 축 순서 (시작 시각 순: 06시간대이전, 06-07, …, 24시간대이후)
+TENSOR_BINS = hour_bins(HOUR_COLS)
+TENSOR_HOURS = [b.name for b in TENSOR_BINS]
+
+
+def _month_frames(dataset_root):
+    for ym in dataset_months(dataset_root):
+        p = pd.Period(ym, freq="M")
+        yield load_ridership(dataset_root, columns=["수송일자", "역명", "승하차구분"] + HOUR_COLS,
+                             years=[p.year], months=[p.month])
+
+
+def _scan_dims(frames):
+    """역명 목록 / 날짜 범위 / 인원수 최댓값 (조각 단위로 훑기)"""
+    stations, start, end, vmax = set(), None, None, 0
+    for df in frames:
+        stations.update(df["역명"].dropna().astype(str).unique())
+        dates = df["수송일자"].dropna()
+        if len(dates):
+            start = dates.min() if start is None else min(start, dates.min())
+            end = dates.max() if end is None else max(end, dates.max())
+        m = (df.groupby(["역명", "수송일자", "승하차구분"], observed=True)[HOUR_COLS]
+               .sum().max().max()) if len(df) else None
+        if pd.notna(m):
+            vmax = max(vmax, int(m))
+    return sorted(stations), start, end, vmax
+
+
+def _fill(data, observed, df, stations, start):
+    """일 단위 조각 → 텐서 위치에 더하기 (인덱스 배열로 한 번에, 같은 칸은 np.add.at으로 누적)"""
+    df = df.dropna(subset=["수송일자", "역명", "승하차구분"])
+    s = pd.Categorical(df["역명"].astype(str), categories=stations).codes
+    d = ((df["수송일자"].to_numpy() - np.datetime64(start, "D")) // np.timedelta64(1, "D")).astype(np.int64)
+    r = pd.Categorical(df["승하차구분"].astype(str), categories=DIRECTIONS).codes
+    ok = (s >= 0) & (r >= 0)
+    s, d, r = s[ok], d[ok], r[ok]
+    values = df.loc[ok, TENSOR_HOURS].fillna(0).to_numpy(dtype=data.dtype)
+    np.add.at(data, (s, d, slice(None), r), values)
+    observed[s, d, r] = True
+
+
+def build_tensor(source, out_dir) -> Path:
+    """
+    source(일 단위 DataFrame 또는 Parquet 데이터셋 경로) → out_dir 에 tensor.npy / observed.npy / _dims.json
+    - 데이터셋이면 월 파티션씩 읽어 메모리 맵에 바로 기록 (메모리는 한 달 분량)
+      (차원 크기를 정하는 훑기 1번 + 기록 1번)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def frames():
+        return [source] if isinstance(source, pd.DataFrame) else _month_frames(source)
+
+    stations, start, end, vmax = _scan_dims(frames())
+    if start is None:
+        raise ValueError("수송일자가 있는 행이 없습니다.")
+
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    n_days = (end - start).days + 1
+    dtype = np.uint16 if vmax <= np.iinfo(np.uint16).max else np.uint32
+    shape = (len(stations), n_days, len(TENSOR_HOURS), len(DIRECTIONS))
+
+    data = np.lib.format.open_memmap(out_dir / DATA_NAME, mode="w+", dtype=dtype, shape=shape)
+    observed = np.lib.format.open_memmap(out_dir / MASK_NAME, mode="w+", dtype=bool, shape=shape[:2] + shape[3:])
+    data[:] = 0
+    observed[:] = False
+
+    for df in frames():
+        _fill(data, observed, df, stations, start)
+    data.flush()
+    observed.flush()
+    del data, observed
+
+    dims = {
+        "역명": stations,
+        "시작일": start.strftime("%Y-%m-%d"),
+        "일수": n_days,
+        "시간대": TENSOR_HOURS,
+        "승하차구분": DIRECTIONS,
+        "dtype": np.dtype(dtype).name,
+    }
+    with open(out_dir / DIMS_NAME, "w", encoding="utf-8") as f:
+        json.dump(dims, f, ensure_ascii=False, indent=1)
+    return out_dir
+
+
+class RidershipTensor:
+    """메모리 맵 텐서 + 차원 조회표"""
+
+    def __init__(self, root):
+        root = Path(root)
+        with open(root / DIMS_NAME, "r", encoding="utf-8") as f:
+            dims = json.load(f)
+        self.data = np.load(root / DATA_NAME, mmap_mode="r")
+        self.observed = np.load(root / MASK_NAME, mmap_mode="r")
+        self.stations = pd.Index(dims["역명"], name="역명")
+        self.dates = pd.date_range(dims["시작일"], periods=dims["일수"], freq="D", name="수송일자")
+        self.hours = pd.Index(dims["시간대"], name="시간대")
+        self.bins = hour_bins(dims["시간대"])
+        self.directions = pd.Index(dims["승하차구분"], name="승하차구분")
+        self._days = None
+
+    # ---- 차원 조회 ----
+    @property
+    def days(self) -> pd.DataFrame:
+        """날짜 축 차원 테이블 (연도/월/요일/평일휴일/계절, 텐서의 일 인덱스와 같은 순서)"""
+        if self._days is None:
+            self._days = date_dimension(self.dates)
+        return self._days
+
+    def station_index(self, names) -> np.ndarray:
+        idx = self.stations.get_indexer(np.atleast_1d(names))
+        if (idx < 0).any():
+            missing = list(np.atleast_1d(names)[idx < 0])
+            raise KeyError(f"텐서에 없는 역명입니다: {missing}")
+        return idx
+
+    def direction_index(self, name: str) -> int:
+        if name not in self.directions:
+            raise KeyError(f"승하차구분은 {list(self.directions)} 중 하나여야 합니다.")
+        return self.directions.get_loc(name)
+
+    def day_slice(self, start=None, end=None) -> slice:
+        """날짜 구간 [start, end] → 일 축 slice"""
+        i = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start))
+        j = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        return slice(i, j)
+
+    def weekday_mask(self) -> np.ndarray:
+        return (self.dates.weekday < 5)
+
+    def month_mask(self, ym: str) -> np.ndarray:
+        return self.dates.strftime("%Y-%m") == ym
+
+    def hour_slice(self, start: int, end: int) -> slice:
+        """[start, end) 시간창에 완전히 들어가는 시간대 → 시간대 축 slice (시간대는 시작 시각 순이라 연속)"""
+        idx = [i for i, b in enumerate(self.bins) if b.start >= start and b.end <= end]
+        if not idx:
+            raise ValueError(f"{start}~{end}시 구간에 해당하는 시간대가 없습니다.")
+        return slice(idx[0], idx[-1] + 1)
+
+    # ---- 집계 ----
+    def window_sum(self, start: int, end: int) -> np.ndarray:
+        """
+        [start, end) 시간창 합계 → (역, 일, 승하차)
+        - 메모리 맵에서 해당 시간대 칸만 바로 합산 (텐서 전체 크기의 복사본/누적합 배열은 만들지 않음)
+        """
+        hs = self.hour_slice(start, end)
+        return self.data[:, :, hs, :].sum(axis=2, dtype=np.uint32)
+
+    def daily_total(self) -> np.ndarray:
+        """하루 전체 합계 → (역, 일, 승하차)"""
+        return self.data.sum(axis=2, dtype=np.uint32)
+
+    def profile(self, station: str, direction: str, days=None) -> pd.Series:
+        """한 역·방향의 시간대별 평균 하루 (관측된 날만, days: bool 마스크 또는 slice)"""
+        s = self.station_index(station)[0]
+        r = self.direction_index(direction)
+        days = slice(None) if days is None else days
+        block = self.data[s, days, :, r]
+        seen = self.observed[s, days, r]
+        n = int(seen.sum())
+        mean = block[seen].sum(axis=0, dtype=np.uint64) / n if n else np.full(len(self.hours), np.nan)
+        return pd.Series(mean, index=self.hours, name=f"{station}_{direction}")
+
+    def monthly_mean(self, days=None) -> tuple[pd.Index, np.ndarray]:
+        """
+        월별 평균 하루 → (월 목록, (역, 월, 시간대, 승하차) float 배열)
+        - days: 포함할 날 bool 마스크 (예: weekday_mask())
+        - 관측된 날만 평균 (관측이 없는 칸은 NaN)
+        - 환승역은 역번호 여러 개를 한 칸에 합산한 값의 평균 → 역번호 행마다 평균 내는
+          월별 요약 CSV와 다름 (환승역이 아닌 역만 요약 CSV의 시간대 값(반올림 전)과 같음)
+        - 한 달 구간씩 읽어서 줄임 (메모리는 한 달 분량 + 결과 배열)
+        """
+        keep = np.ones(len(self.dates), dtype=bool) if days is None else np.asarray(days)
+        ym = self.dates.strftime("%Y-%m")
+        starts = np.flatnonzero(np.r_[True, ym[1:] != ym[:-1]])
+        ends = np.r_[starts[1:], len(ym)]
+
+        s, _, h, r = self.data.shape
+        mean = np.full((s, len(starts), h, r), np.nan)
+        for k, (i, j) in enumerate(zip(starts, ends)):
+            seen = self.observed[:, i:j, :] & keep[None, i:j, None]
+            sums = np.where(seen[:, :, None, :], self.data[:, i:j], 0).sum(axis=1, dtype=np.uint64)
+            cnts = seen.sum(axis=1)[:, None, :]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean[:, k] = np.where(cnts > 0, sums / cnts, np.nan)
+        return pd.Index(ym[starts], name="월"), mean
+
+
+def open_tensor(root) -> RidershipTensor:
+    """저장된 텐서 열기 (메모리 맵, 실제 값은 접근할 때 읽음)"""
+    return RidershipTensor(root)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+시간대 누적합 색인 (임의 시간창 [start, end) 합계/비율을 한 번에)
+- 시간대 컬럼을 시작 시각 순으로 놓고 누적합(맨 앞 0 포함)을 미리 계산
+  → 어떤 시간창이든 셀마다 뺄셈 한 번: 누적[:, j] - 누적[:, i]
+- 포함 규칙은 window_columns와 같음: 시작 시각 >= start, 끝 시각 <= end
+  예) 10, 17 → 10-11 … 16-17시간대 /  6, 10 → 06-07 … 09-10시간대 (06시간대이전 제외)
+- 입력은 키 컬럼 + 시간대 컬럼이 있는 표 (월별 요약, 롤업 테이블 등)
+  예) p = HourPrefix.from_table(load_rollup(ROLLUP_DIR, "월", "평일휴일"))
+      p.window(10, 17)          # 모든 (월, 평일휴일, 역, 승하차) 셀의 10~17시 합계
+      p.share(10, 17)           # 하루 전체 대비 비율
+      p.sweep()                 # 가능한 모든 시간창 합계 표
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from 시간대_컬럼 import HourBin, hour_bins
+
+
+class HourPrefix:
+    """키 표 + (셀, 시간대 + 1) 누적합 배열"""
+
+    def __init__(self, keys: pd.DataFrame, prefix: np.ndarray, bins):
+        self.keys = keys.reset_index(drop=True)
+        self.prefix = prefix
+        self.bins = tuple(bins)
+        self._starts = np.array([b.start for b in self.bins])
+        self._ends = np.array([b.end for b in self.bins])
+
+    @classmethod
+    def from_table(cls, table: pd.DataFrame, keys=None) -> "HourPrefix":
+        """
+        표 → 누적합 색인 (결측 시간대는 0으로, 합계 sum(axis=1)과 같은 기준)
+        - keys: 함께 남길 키 컬럼 (None이면 시간대 컬럼과 "시간대_합계" 같은 시간대별 상태 컬럼을 뺀 나머지)
+        """
+        if isinstance(table, pd.Series):
+            table = table.to_frame().T
+        bins = hour_bins(table.columns)
+        if not bins:
+            raise ValueError("시간대 컬럼을 찾지 못했습니다. 컬럼명을 확인해 주세요.")
+        names = [b.name for b in bins]
+        if keys is None:
+            keys = [c for c in table.columns if c not in names and not str(c).startswith(tuple(names))]
+        values = table[names].astype("Float64").to_numpy(dtype=float, na_value=0.0)
+        prefix = np.zeros((len(table), len(names) + 1))
+        np.cumsum(values, axis=1, out=prefix[:, 1:])
+        return cls(table[list(keys)].copy(), prefix, bins)
+
+    # ---- 시간창 ----
+    def span(self, start: int, end: int) -> tuple[int, int]:
+        """[start, end) 에 완전히 들어가는 시간대 → 누적합 위치 (i, j)"""
+        i = int(np.searchsorted(self._starts, start, side="left"))
+        j = int(np.searchsorted(self._ends, end, side="right"))
+        if j <= i:
+            raise ValueError(f"{start}~{end}시 구간에 해당하는 시간대 컬럼을 찾지 못했습니다. 컬럼명을 확인해 주세요.")
+        return i, j
+
+    def columns(self, start: int, end: int) -> list[str]:
+        i, j = self.span(start, end)
+        return [b.name for b in self.bins[i:j]]
+
+    def window(self, start: int, end: int) -> np.ndarray:
+        """셀별 [start, end) 합계"""
+        i, j = self.span(start, end)
+        return self.prefix[:, j] - self.prefix[:, i]
+
+    def total(self) -> np.ndarray:
+        """셀별 하루 전체 합계"""
+        return self.prefix[:, -1]
+
+    def share(self, start: int, end: int) -> np.ndarray:
+        """셀별 [start, end) 합계 / 하루 전체 (전체가 0이면 NaN)"""
+        tot = self.total()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(tot > 0, self.window(start, end) / tot, np.nan)
+
+    def frame(self, start: int, end: int) -> pd.DataFrame:
+        """키 + 시간창 합계 + 하루 전체 + 비율(%)"""
+        out = self.keys.copy()
+        out[f"합계_{start}to{end}"] = self.window(start, end)
+        out["하루합계"] = self.total()
+        out[f"비율_{start}to{end}"] = self.share(start, end) * 100
+        return out
+
+    def edges(self) -> list[int]:
+        """시간창 경계로 쓸 수 있는 시각 목록 (시간대 시작/끝)"""
+        return sorted(set(self._starts.tolist()) | set(self._ends.tolist()))
+
+    def sweep(self, windows=None, share: bool = False) -> pd.DataFrame:
+        """
+        여러 시간창을 한 번에 → 키 + 'HH-HH' 컬럼들
+        - windows: [(start, end), ...] (None이면 경계 시각으로 만들 수 있는 모든 시간창)
+        - share=True면 합계 대신 하루 전체 대비 비율(0~1)
+        """
+        if windows is None:
+            e = self.edges()
+            windows = [(a, b) for k, a in enumerate(e) for b in e[k + 1:]]
+        cols = {}
+        for a, b in windows:
+            cols[f"{a:02d}-{b:02d}"] = self.share(a, b) if share else self.window(a, b)
+        return pd.concat([self.keys, pd.DataFrame(cols)], axis=1)
+
+    # ---- 저장 / 읽기 ----
+    def save(self, path):
+        """path.npz (누적합 + 시간대 구간) + path.parquet (키)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path.with_suffix(".npz"), prefix=self.prefix,
+                 names=np.array([b.name for b in self.bins]),
+                 starts=self._starts, ends=self._ends)
+        self.keys.to_parquet(path.with_suffix(".parquet"), index=False)
+
+    @classmethod
+    def load(cls, path) -> "HourPrefix":
+        path = Path(path)
+        z = np.load(path.with_suffix(".npz"))
+        bins = [HourBin(str(n), int(s), int(e)) for n, s, e in zip(z["names"], z["starts"], z["ends"])]
+        return cls(pd.read_parquet(path.with_suffix(".parquet")), z["prefix"], bins)
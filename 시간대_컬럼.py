@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+시간대 컬럼 해석기
+- 원본마다 다른 헤더 표기("06~07", "06 ~ 07시간대", "23시간대이후", 전각 공백 등)를
+  표준 이름("06-07시간대", "23-24시간대", "06시간대이전", "24시간대이후")으로 통일
+- 각 시간대 구간(bin)의 시작/끝 시각과 정렬 순서를 제공
+  · 06시간대이전 = [0, 6), HH-HH시간대 = [HH, HH+1), 24시간대이후 = [24, 25)
+- 같은 헤더 구성(헤더 시그니처)은 한 번만 해석하고 캐시 → 같은 레이아웃 파일은 즉시 처리
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# 시작 이전 구간의 시작 시각 / 마지막 이후 구간의 끝 시각 (정렬·폭 계산용)
+DAY_START = 0
+DAY_END = 25
+
+_DASHES = str.maketrans({"~": "-", "∼": "-", "～": "-", "–": "-", "—": "-", "－": "-"})
+_RANGE = re.compile(r"^(\d{1,2})-(\d{1,2})(?:시간대|시)?$")
+_BEFORE = re.compile(r"^(\d{1,2})(?:시간대|시)이전$")
+_AFTER = re.compile(r"^(\d{1,2})(?:시간대|시)이후$")
+
+
+class HourBin(NamedTuple):
+    name: str    # 표준 컬럼명
+    start: int   # 시작 시각 (포함)
+    end: int     # 끝 시각 (미포함)
+
+    @property
+    def hours(self) -> int:
+        return self.end - self.start
+
+
+def _squash(raw) -> str:
+    """공백(전각 포함) 제거 + 물결/대시 통일"""
+    return re.sub(r"\s+", "", str(raw).replace("\u3000", "")).translate(_DASHES)
+
+
+@lru_cache(maxsize=None)
+def parse_bin(raw) -> HourBin | None:
+    """헤더 하나 → HourBin (시간대 컬럼이 아니면 None)"""
+    s = _squash(raw)
+
+    m = _RANGE.match(s)
+    if m:
+        a, b = int(m.group(1)), int(m.group(2))
+        return HourBin(f"{a:02d}-{b:02d}시간대", a, b)
+
+    m = _BEFORE.match(s)
+    if m:
+        h = int(m.group(1))
+        return HourBin(f"{h:02d}시간대이전", DAY_START, h)
+
+    m = _AFTER.match(s)
+    if m:
+        h = int(m.group(1))
+        if h == 23:
+            # 원본에서 자주 섞이는 표기: 23시간대이후 == 23-24시간대
+            return HourBin("23-24시간대", 23, 24)
+        return HourBin(f"{h:02d}시간대이후", h, DAY_END)
+
+    return None
+
+
+def canonical_name(raw) -> str:
+    """헤더 하나 → 표준 이름 (시간대가 아니면 공백만 제거)"""
+    b = parse_bin(raw)
+    return b.name if b is not None else re.sub(r"\s+", "", str(raw).replace("\u3000", ""))
+
+
+class ColumnLayout(NamedTuple):
+    rename: dict          # 원본 헤더 → 표준 이름
+    bins: tuple           # 시간대 구간 (시작 시각 순)
+
+    @property
+    def hour_cols(self) -> list[str]:
+        return [b.name for b in self.bins]
+
+
+@lru_cache(maxsize=256)
+def _resolve(signature: tuple) -> ColumnLayout:
+    rename = {c: canonical_name(c) for c in signature}
+    bins = {}
+    for c in signature:
+        b = parse_bin(c)
+        if b is not None:
+            bins[b.name] = b
+    return ColumnLayout(rename, tuple(sorted(bins.values(), key=lambda b: (b.start, b.end))))
+
+
+def resolve_columns(columns) -> ColumnLayout:
+    """헤더 목록 전체 해석 (헤더 시그니처 단위 캐시)"""
+    return _resolve(tuple(str(c) for c in columns))
+
+
+def hour_bins(columns) -> tuple:
+    """DataFrame 컬럼 중 시간대 구간만 시작 시각 순으로"""
+    return resolve_columns(columns).bins
+
+
+def hour_columns(columns) -> list[str]:
+    """DataFrame 컬럼 중 시간대 컬럼 이름만 시작 시각 순으로"""
+    return resolve_columns(columns).hour_cols
+
+
+def window_columns(columns, start: int, end: int) -> list[str]:
+    """[start, end) 시간창 안에 완전히 들어가는 시간대 컬럼 (예: 10, 17 → 10-11 … 16-17)"""
+    return [b.name for b in hour_bins(columns) if b.start >= start and b.end <= end]
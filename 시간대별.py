@@ -2,6 +2,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import platform
 
+from 승하차_스키마 import read_summary
+from 시간대_컬럼 import hour_columns
+
 # 한글 폰트
 if platform.system() == "Windows":
     plt.rcParams['font.family'] = 'Malgun Gothic'
@@ -12,18 +15,11 @@ else:
 plt.rcParams['axes.unicode_minus'] = False
 
 file_path = "/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/시간대별_월평균_평일휴일_역별_승하차_통합(반올림_행합계포함).csv"
-try:
-    df = pd.read_csv(file_path, encoding="utf-8")
-except UnicodeDecodeError:
-    df = pd.read_csv(file_path, encoding="cp949")
+df = read_summary(file_path)   # 공통 스키마(UInt16 시간대, 범주형 키) 적용
 
 weekday = df[df["평일휴일"] == "평일"]
-time_cols = [c for c in weekday.columns if "시간대" in c]
-
-# ✅ 컬럼 순서 조정: "06-07시간대"를 두 번째로 옮김
-if "06-07시간대" in time_cols:
-    time_cols.remove("06-07시간대")
-    time_cols.insert(1, "06-07시간대")
+# 시간대 컬럼을 시작 시각 순으로 (06시간대이전 → 06-07 → … → 24시간대이후)
+time_cols = hour_columns(weekday.columns)
 
 # 1) 월별로 역/승하차를 모두 합쳐 '그 달의 하루' 만들기
 monthly_city_day = weekday.groupby("월")[time_cols].sum()
@@ -5,6 +5,9 @@ from matplotlib.ticker import FuncFormatter
 from matplotlib.patches import Patch
 import numpy as np
 
+from 시간대_누적 import HourPrefix
+from 집계_백엔드 import weekday_monthly_profile
+
 # 한글 폰트 설정
 if platform.system() == "Windows":
     plt.rcParams['font.family'] = 'Malgun Gothic'
@@ -17,45 +20,18 @@ plt.rcParams['axes.unicode_minus'] = False
 # 파일 경로 (본인의 파일 경로로 수정하세요)
 file_path = "/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/시간대별_월평균_평일휴일_역별_승하차_통합(반올림_행합계포함).csv"
 
-# CSV 파일 읽기 (인코딩 처리)
-try:
-    df = pd.read_csv(file_path, encoding="utf-8")
-except UnicodeDecodeError:
-    df = pd.read_csv(file_path, encoding="cp949")
-
-print("데이터 정보:")
-print(f"총 행 수: {len(df)}")
-print(f"컬럼 수: {len(df.columns)}")
-print("\n컬럼명:", df.columns.tolist())
-
-if "평일휴일" not in df.columns:
-    raise ValueError("데이터에 '평일휴일' 컬럼이 없습니다.")
-if "월" not in df.columns:
-    raise ValueError("데이터에 '월' 컬럼이 없습니다.")
-
-print("\n평일휴일 구분:", df['평일휴일'].unique())
-print("월 구분:", sorted(df['월'].unique()))
-
-# 평일 데이터만 필터링
-weekday = df[df["평일휴일"] == "평일"].copy()
-print(f"\n평일 데이터 행 수: {len(weekday)}")
-
-# 시간대 컬럼(이 순서로 표시)
-time_cols = [
-    '06시간대이전', '06-07시간대', '07-08시간대', '08-09시간대', '09-10시간대',
-    '10-11시간대', '11-12시간대', '12-13시간대', '13-14시간대', '14-15시간대',
-    '15-16시간대', '16-17시간대', '17-18시간대', '18-19시간대', '19-20시간대',
-    '20-21시간대', '21-22시간대', '22-23시간대', '23-24시간대', '24시간대이후'
-]
-existing_time_cols = [c for c in time_cols if c in weekday.columns]
-if not existing_time_cols:
-    raise ValueError("시간대 컬럼이 존재하지 않습니다. 입력 데이터를 확인하세요.")
+# 집계 엔진: "pandas"(즉시 실행) 또는 "polars"(지연 실행 + 스트리밍), 결과는 같음
+ENGINE = "pandas"
+
+# 1) 평일만, 월별로 역/승하차를 모두 합쳐 '그 달의 하루' 만들기 (시간대는 시작 시각 순)
+#    (평일휴일/월 컬럼이나 시간대 컬럼이 없으면 ValueError)
+monthly_city_day = weekday_monthly_profile(file_path, engine=ENGINE)
+existing_time_cols = list(monthly_city_day.columns)
 
+print(f"[집계 엔진] {ENGINE}")
+print("월 구분:", list(monthly_city_day.index))
 print(f"\n사용할 시간대 컬럼 수: {len(existing_time_cols)}")
 print("시간대 컬럼들:", existing_time_cols)
-
-# 1) 월별로 역/승하차를 모두 합쳐 '그 달의 하루' 만들기
-monthly_city_day = weekday.groupby("월")[existing_time_cols].sum()
 print(f"\n월별 집계 완료. 월 수: {len(monthly_city_day)}")
 
 # 2) 여러 달을 평균해 '대표 하루' 만들기
@@ -63,12 +39,16 @@ city_daily_avg = monthly_city_day.mean()
 
 print(f"\n일평균 계산 완료. 시간대 수: {len(city_daily_avg)}")
 
-# --- 구간 정의 ---
-work_slots = ['10-11시간대','11-12시간대','12-13시간대',
-              '13-14시간대','14-15시간대','15-16시간대','16-17시간대']  # 근무시간
-commute_slots = ['06-07시간대','07-08시간대','08-09시간대','09-10시간대','17-18시간대','18-19시간대','19-20시간대','20-21시간대']  # 출퇴근
+# --- 구간 정의 (시작/끝 시각, [start, end)) ---
+WORK_WINDOWS = [(10, 17)]               # 근무시간
+COMMUTE_WINDOWS = [(6, 10), (17, 21)]   # 출퇴근
 # 나머지는 기타(심야/이른 새벽 등)
 
+# 시간대 누적합 색인 → 시간창 합계는 뺄셈 한 번
+prefix = HourPrefix.from_table(city_daily_avg)
+work_slots = [c for a, b in WORK_WINDOWS for c in prefix.columns(a, b)]
+commute_slots = [c for a, b in COMMUTE_WINDOWS for c in prefix.columns(a, b)]
+
 # --- 색상 (주석과 실제 색 일치) ---
 commute_color = '#BAE1FF'   # 연한 블루: 출퇴근시간
 work_color = '#FFBADF'      # 연한 핑크: 근무시간(9-18)
@@ -133,12 +113,12 @@ print(f"최고 이용 시간대: {city_daily_avg.idxmax()} ({city_daily_avg.max(
 print(f"최저 이용 시간대: {city_daily_avg.idxmin()} ({city_daily_avg.min():,.0f}명)")
 
 # --- 구간별 합계/비율 ---
-def safe_sum(slots):
-    return float(sum(city_daily_avg[s] for s in slots if s in city_daily_avg.index))
+def window_total(windows):
+    return float(sum(prefix.window(a, b)[0] for a, b in windows))
 
-work_total = safe_sum(work_slots)
-commute_total = safe_sum(commute_slots)
-total = float(city_daily_avg.sum())
+work_total = window_total(WORK_WINDOWS)
+commute_total = window_total(COMMUTE_WINDOWS)
+total = float(prefix.total()[0])
 other_total = total - work_total - commute_total
 
 print(f"\n=== 시간대별 비교 ===")
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+(승하차구분 × 역명) 단위 CSV 분할 저장
+- 임시 파일에 쓴 뒤 os.replace로 교체 → 중간에 끊겨도 반쯤 쓰인 CSV가 남지 않음
+- 내용 해시를 매니페스트에 기록해 두고, 내용이 같은 그룹은 CSV 변환부터 건너뜀
+  → 데이터가 조금 바뀌었을 때 바뀐 역 파일만 다시 씀
+  (CSV 변환은 GIL을 잡는 작업이라 스레드로 나눠도 빨라지지 않음, 건너뛰기가 실제 절약)
+- 입력에 더 이상 없는 그룹(역명 변경 등)의 파일과 매니페스트 항목은 삭제
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+MANIFEST_NAME = "_분할저장_해시.json"
+
+
+# ===== 안전한 폴더명 =====
+def safe_name(name: str) -> str:
+    s = str(name).strip()
+    s = re.sub(r'[\\/:*?"<>|]', "_", s)
+    s = re.sub(r"\s+", " ", s)
+    return s
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp_", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _group_digest(header: bytes, row_hash, idx) -> str:
+    """그룹 행들의 행 해시(uint64)를 이어 붙여 sha256"""
+    h = hashlib.sha256(header)
+    h.update(row_hash[idx].tobytes())
+    return h.hexdigest()
+
+
+def _is_partition(path: Path, root: Path) -> bool:
+    """root/{구분}/{역}/{역}_{구분}.csv 모양의 파일인지 (이 모듈이 만든 파일만 정리 대상)"""
+    rel = path.relative_to(root)
+    return len(rel.parts) == 3 and rel.name == f"{rel.parts[1]}_{rel.parts[0]}.csv"
+
+
+def _remove_stale(root: Path, manifest: dict, current: set) -> int:
+    """현재 그룹에 없는 분할 파일/매니페스트 항목 삭제 → 지운 파일 수 (빈 폴더도 정리)"""
+    stale = {rel for rel in manifest if rel not in current}
+    stale |= {p.relative_to(root).as_posix() for p in root.glob("*/*/*.csv")
+              if _is_partition(p, root) and p.relative_to(root).as_posix() not in current}
+    removed = 0
+    for rel in sorted(stale):
+        manifest.pop(rel, None)
+        path = root / rel
+        if path.exists():
+            path.unlink()
+            removed += 1
+        for folder in (path.parent, path.parent.parent):
+            if folder.is_dir() and not any(folder.iterdir()):
+                folder.rmdir()
+    return removed
+
+
+def write_station_partitions(merged: pd.DataFrame, root, columns=None,
+                             keys=("승하차구분", "역명")) -> dict:
+    """
+    root/{승하차구분}/{역명}/{역명}_{승하차구분}.csv 로 분할 저장
+    - columns: 저장할 컬럼 순서 (None이면 merged 컬럼 그대로)
+    - 이번 입력에 없는 그룹의 분할 파일은 삭제
+    반환: {"written": n, "skipped": n, "removed": n}
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / MANIFEST_NAME
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+
+    columns = list(columns) if columns is not None else list(merged.columns)
+    table = merged[columns]
+
+    # 내용 해시: 전체 행 해시를 한 번에 벡터로 계산 → 그룹별로는 잘라서 이어 붙이기만
+    header = "\x1f".join(columns).encode("utf-8")
+    row_hash = pd.util.hash_pandas_object(table, index=False).to_numpy()
+
+    def _one(item):
+        (gubun, station), idx = item
+        gubun_safe = safe_name(gubun)
+        station_safe = safe_name(station)
+        out_csv = root / gubun_safe / station_safe / f"{station_safe}_{gubun_safe}.csv"
+        rel = out_csv.relative_to(root).as_posix()
+
+        digest = _group_digest(header, row_hash, idx)
+        if manifest.get(rel) == digest and out_csv.exists():
+            return rel, digest, False
+
+        _atomic_write(out_csv, table.iloc[idx].to_csv(index=False).encode("utf-8-sig"))
+        return rel, digest, True
+
+    groups = merged.groupby(list(keys), dropna=False, sort=False, observed=True).indices.items()
+    written = skipped = 0
+    current = set()
+    for rel, digest, changed in map(_one, groups):
+        manifest[rel] = digest
+        current.add(rel)
+        if changed:
+            written += 1
+        else:
+            skipped += 1
+    removed = _remove_stale(root, manifest, current)
+
+    _atomic_write(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+    return {"written": written, "skipped": skipped, "removed": removed}
@@ -8,6 +8,7 @@
   3) 역별 총 하차량(평균일일합계 합계) 기준 Top 5 선택
   4) 월별 추이 라인그래프 출력 및 저장
   5) 변환된 전체 CSV를 '서울_하차_월평균_변환.csv'로 저장 (UTF-8-SIG)
+  6) 모든 역의 월별 순위(역 × 월)를 한 번에 계산 → 변동성 / 급등락 역 출력, 순위 배열 저장, Top5 범프 차트
 """
 
 import os
@@ -17,6 +18,11 @@ import matplotlib.pyplot as plt
 from matplotlib import font_manager, rcParams
 from pathlib import Path
 
+from 인코딩감지 import read_csv_auto
+from 날짜_차원 import attach_periods
+from 순위_엔진 import Ranker
+from 순위_추이 import RankTrajectory
+
 # =========================
 # 0) 사용자 설정
 # =========================
@@ -24,6 +30,8 @@ from pathlib import Path
 IN_CSV  = Path("/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/서울_하차_월평균_형식정리.csv")      # 원본
 OUT_CSV = Path("서울_하차_월평균_변환.csv")  # 변환 저장본
 OUT_PNG = Path("월별_인기하차역_Top5_추이.png")
+OUT_RANK = Path("월별_하차역_순위")               # 순위 배열 (.npz + .parquet)
+OUT_BUMP = Path("월별_인기하차역_Top5_순위.png")
 
 # =========================
 # 1) 한글 폰트 자동 설정
@@ -51,19 +59,10 @@ set_korean_font()
 # =========================
 # 2) CSV 로드 (인코딩 안전)
 # =========================
-def read_csv_safely(p: Path) -> pd.DataFrame:
-    last_err = None
-    for enc in ["utf-8", "utf-8-sig", "cp949"]:
-        try:
-            return pd.read_csv(p, encoding=enc)
-        except Exception as e:
-            last_err = e
-    raise RuntimeError(f"CSV 읽기 실패: {p} / 마지막 오류: {last_err}")
-
 if not IN_CSV.exists():
     raise FileNotFoundError(f"입력 파일을 찾을 수 없습니다: {IN_CSV.resolve()}")
 
-df = read_csv_safely(IN_CSV).copy()
+df = read_csv_auto(IN_CSV).copy()
 
 # =========================
 # 3) '월' 컬럼을 YYYY-MM으로 통일
@@ -71,23 +70,8 @@ df = read_csv_safely(IN_CSV).copy()
 if "월" not in df.columns:
     raise KeyError("'월' 컬럼이 없습니다. CSV를 확인하세요.")
 
-# 다양한 형식 대응: 'YYYY-MM' 또는 'Jul-21' 등
-def normalize_month_col(series: pd.Series) -> pd.Series:
-    # 1차: YYYY-MM
-    s = pd.to_datetime(series, format="%Y-%m", errors="coerce")
-    # 2차: 영문 약어-2자리 연도 (Jul-21 등)
-    mask = s.isna()
-    if mask.any():
-        s2 = pd.to_datetime(series[mask], format="%b-%y", errors="coerce")
-        s.loc[mask] = s2
-    # 3차: 최종 파싱 (자동 추론)
-    mask = s.isna()
-    if mask.any():
-        s3 = pd.to_datetime(series[mask], errors="coerce")
-        s.loc[mask] = s3
-    return s.dt.strftime("%Y-%m")
-
-df["월"] = normalize_month_col(df["월"])
+# 다양한 형식 대응: 'YYYY-MM', 'YYYYMM', 'Jul-21' 등 (고유값만 한 번 파싱 → 'YYYY-MM' 범주형)
+df = attach_periods(df, "월", attrs=("월",))
 
 # =========================
 # 4) 안전 캐스팅 & 필터 (평일+하차)
@@ -115,12 +99,7 @@ print(f"[저장] 변환된 CSV -> {OUT_CSV.resolve()}  (행 {len(df):,} / 열 {d
 if "역명" not in df.columns:
     raise KeyError("'역명' 컬럼이 없습니다. CSV를 확인하세요.")
 
-popular = (
-    df.groupby("역명")["평균일일합계"]
-      .sum()
-      .sort_values(ascending=False)
-)
-top5 = list(popular.head(5).index)
+top5 = list(Ranker(df).top([], "평균일일합계", k=5)["역명"])
 print("[Top5 역]", ", ".join(top5))
 
 # =========================
@@ -152,5 +131,20 @@ plt.tight_layout()
 plt.savefig(OUT_PNG, dpi=200)
 print(f"[저장] 그래프 이미지 -> {OUT_PNG.resolve()}")
 
+# =========================
+# 8) 모든 역 월별 순위 추이 (역 × 월 순위표 한 번에)
+# =========================
+traj = RankTrajectory.from_table(df, "평균일일합계")
+traj.save(OUT_RANK)
+print(f"[저장] 역 × 월 순위 -> {OUT_RANK.resolve()}.npz  (역 {len(traj.stations):,} / 월 {len(traj.periods)})")
+
+print("[순위 변동성 상위 10]")
+print(traj.volatility().head(10).round(2).to_string())
+print(f"[순위 급등락 상위 10] {traj.periods[0]} -> {traj.periods[-1]}")
+print(traj.movers(n=10).to_string())
+
+traj.bump(top5, path=OUT_BUMP, title="월별 인기 하차역 Top 5 순위 추이")
+print(f"[저장] 범프 차트 -> {OUT_BUMP.resolve()}")
+
 # 창에 표시 (VS Code Python: plot viewer에서 확인 가능)
 plt.show()
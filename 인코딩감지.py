@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+CSV 인코딩 자동 감지 + 1회 파싱 로더
+- 파일 앞부분(기본 64KB)만 읽어 인코딩을 판별 (BOM → utf-8 → cp949 순)
+- 판별 결과는 (경로, 크기, 수정시각) 기준으로 매니페스트(JSON)에 저장해
+  같은 파일을 다시 읽을 때는 추측 없이 바로 사용
+- 인코딩 후보별로 파일 전체를 여러 번 다시 읽던 read_csv_robust / read_csv_smart /
+  read_csv_safely 대체용
+"""
+
+import codecs
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+MANIFEST_PATH = Path(__file__).with_name(".encoding_manifest.json")
+SNIFF_BYTES = 64 * 1024
+
+# utf-8 실패 시 시도할 한글 인코딩 (euc-kr은 cp949의 부분집합)
+FALLBACK_ENCODINGS = ("cp949",)
+
+_manifest = None
+_lock = threading.Lock()   # 여러 스레드가 동시에 파일을 읽을 때 매니페스트 보호
+
+
+def _load_manifest() -> dict:
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _manifest = {}
+    return _manifest
+
+
+def _save_manifest():
+    tmp = MANIFEST_PATH.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_load_manifest(), f, ensure_ascii=False, indent=1)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def _file_key(path) -> tuple[str, dict]:
+    p = Path(path).resolve()
+    st = p.stat()
+    return str(p), {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _decodes(prefix: bytes, enc: str) -> bool:
+    """앞부분이 enc로 디코딩되는지 (끝에서 잘린 멀티바이트 문자는 허용)"""
+    try:
+        codecs.getincrementaldecoder(enc)().decode(prefix, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """바이트 앞부분으로 인코딩 판별"""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if _decodes(prefix, "utf-8"):
+        return "utf-8"
+    for enc in FALLBACK_ENCODINGS:
+        if _decodes(prefix, enc):
+            return enc
+    return "utf-8"
+
+
+def remember_encoding(path, encoding: str, verified: bool = False):
+    key, stat = _file_key(path)
+    with _lock:
+        _load_manifest()[key] = dict(stat, encoding=encoding, verified=verified)
+        _save_manifest()
+
+
+def detect_encoding(path) -> str:
+    """매니페스트에 (경로, 크기, 수정시각)이 같으면 그대로, 아니면 앞부분만 읽어 판별"""
+    key, stat = _file_key(path)
+    hit = _load_manifest().get(key)
+    if hit and hit.get("size") == stat["size"] and hit.get("mtime_ns") == stat["mtime_ns"]:
+        return hit["encoding"]
+
+    with open(path, "rb") as f:
+        enc = sniff_encoding(f.read(SNIFF_BYTES))
+    remember_encoding(path, enc)
+    return enc
+
+
+def _decodes_file(path, enc: str, block: int = 1 << 20) -> bool:
+    """파일 전체가 enc로 디코딩되는지 (블록 단위, 메모리는 블록 하나)"""
+    dec = codecs.getincrementaldecoder(enc)()
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(block):
+                dec.decode(chunk, final=False)
+        dec.decode(b"", final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def verify_encoding(path) -> str:
+    """
+    파일 전체를 디코딩해 확인한 인코딩 (청크 단위로 읽다가 중간에 실패하지 않도록)
+    - 앞부분 판별이 utf-8인데 뒤에서 깨지면 read_csv_auto와 같은 cp949로 재시도
+    - 확인 결과는 매니페스트에 verified로 기록 → 같은 파일은 다음부터 다시 읽지 않음
+    """
+    key, stat = _file_key(path)
+    hit = _load_manifest().get(key)
+    if (hit and hit.get("verified") and hit.get("size") == stat["size"]
+            and hit.get("mtime_ns") == stat["mtime_ns"]):
+        return hit["encoding"]
+
+    enc = detect_encoding(path)
+    candidates = [enc] + (list(FALLBACK_ENCODINGS) if enc in ("utf-8", "utf-8-sig") else [])
+    for cand in candidates:
+        if _decodes_file(path, cand):
+            remember_encoding(path, cand, verified=True)
+            return cand
+    raise RuntimeError(f"CSV 인코딩 판별 실패: {path}")
+
+
+def read_csv_auto(path, **kwargs) -> pd.DataFrame:
+    """
+    인코딩을 한 번만 판별해서 한 번만 파싱
+    - 앞부분이 ASCII뿐이라 utf-8로 판별됐는데 뒤에서 실패한 경우에만 cp949로 재시도하고,
+      그 결과를 매니페스트에 기록해 다음부터는 바로 cp949로 읽음
+    """
+    enc = detect_encoding(path)
+    try:
+        return pd.read_csv(path, encoding=enc, **kwargs)
+    except UnicodeDecodeError:
+        if enc not in ("utf-8", "utf-8-sig"):
+            raise
+    for enc in FALLBACK_ENCODINGS:
+        try:
+            df = pd.read_csv(path, encoding=enc, **kwargs)
+        except UnicodeDecodeError:
+            continue
+        remember_encoding(path, enc)
+        return df
+    raise RuntimeError(f"CSV 인코딩 판별 실패: {path}")
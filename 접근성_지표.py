@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+역별 시설 접근성 지표 (여러 반경 시설 수 / 유형별 시설 수 / 반경 안 가까운 시설 이름을 한 번에)
+- 공간_색인.SpatialIndex.pairs_within으로 가장 큰 반경 안의 (역, 시설) 쌍만 꺼냄
+  → 역 순, 거리 순으로 정렬된 평평한 배열 하나 (전체 역×시설 쌍 표는 만들지 않음)
+- 쌍마다 "처음 들어가는 반경 구간"을 searchsorted로 한 번 구하고 bincount → 구간 누적합
+  = 모든 반경의 시설 수 (유형별 시설 수도 같은 방식, 유형 코드를 키에 섞음)
+- 반경 안 가까운 N곳: 정렬된 배열에서 역 안 순번 < N 이고 거리 ≤ 반경인 쌍만 골라 이름을 이어 붙임
+  (N=None이면 반경 안 전부 → "500m이내 시설 모음"처럼 개수 제한 없는 목록,
+   "1키로까지 최대3개", "1.5키로까지 최대5개" 도 같은 표에)
+  예) fc = load_or_build("색인/시설", "서울 문화체육 관광분야전시관 시설 데이터.csv")
+      accessibility_table(st, fc)                                     # 250/500/1000/1500m
+      accessibility_table(st, fc, radii=(500, 1000), caps=((1000, 3),), category=None)
+"""
+
+import numpy as np
+import pandas as pd
+
+from 공간_색인 import SpatialIndex
+
+RADII = (250, 500, 1000, 1500)   # 시설 수를 셀 반경 (m)
+CAPS = ((1000, 3), (1500, 5))    # (반경 m, 최대 개수): 반경 안 가까운 순 시설 이름 (None = 제한 없음)
+
+
+def _radius_label(r) -> str:
+    return f"{r:g}m"
+
+
+def accessibility_table(stations: pd.DataFrame, facilities: SpatialIndex, radii=RADII,
+                        category: str | None = "CL_NM", name: str | None = "POI_NM", caps=CAPS,
+                        lat: str = "위도", lng: str = "경도", keep=None) -> pd.DataFrame:
+    """
+    역 표 → 역별 접근성 지표 (역 행 순서 그대로, 좌표 없는 역은 제외)
+    - 시설수_{r}m        : 반경 r 안 시설 수 (radii 마다)
+    - 최근접_시설까지_m  : 가장 큰 반경 안에서 가장 가까운 시설까지 거리 (없으면 결측)
+    - {유형}_{r}m        : 반경 r 안 category 유형별 시설 수 (category=None이면 생략)
+    - 시설_{r}m_최대{n}개 : 반경 r 안 가까운 순 최대 n곳 이름 (", "로 연결, name=None이면 생략)
+    - 시설_{r}m_전체      : n=None이면 반경 r 안 전부 (가까운 순)
+    - keep: 결과에 남길 역 컬럼 (기본: 역 표 전체)
+    """
+    radii = np.unique(np.asarray(radii, dtype=float))
+    caps = [(float(r), None if n is None else int(n)) for r, n in caps] if name is not None else []
+    if radii.size == 0 or radii[0] <= 0 or any(r <= 0 or (n is not None and n < 1) for r, n in caps):
+        raise ValueError("반경은 0보다 크고, 최대 개수는 1 이상이어야 합니다.")
+    for col in [c for c in (category, name) if c is not None]:
+        if col not in facilities.points.columns:
+            raise KeyError(f"'{col}' 컬럼이 시설 색인에 없습니다. CSV를 확인하세요.")
+
+    stations = stations.dropna(subset=[lat, lng]).reset_index(drop=True)
+    out = stations if keep is None else stations[list(keep)]
+    out = out.copy()
+    q, nr = len(stations), len(radii)
+    r_max = max([radii[-1]] + [r for r, _ in caps])
+    owner, hit, d, start = facilities.pairs_within(stations[lat], stations[lng], r_max)
+
+    # 1) 반경별 시설 수: 쌍마다 들어가는 가장 작은 반경 구간 → 구간별 개수 → 누적
+    band = np.searchsorted(radii, d, side="left")          # d ≤ radii[band], 어느 반경에도 안 들면 nr
+    inside = band < nr
+    counts = np.bincount(owner[inside] * nr + band[inside], minlength=q * nr).reshape(q, nr).cumsum(axis=1)
+    for k, r in enumerate(radii):
+        out[f"시설수_{_radius_label(r)}"] = counts[:, k]
+
+    has = start[1:] > start[:-1]
+    nearest = np.full(q, np.nan)
+    nearest[has] = d[start[:-1][has]]        # 역마다 정렬된 첫 쌍 = 가장 가까운 시설
+    out["최근접_시설까지_m"] = nearest
+
+    # 2) 유형별 시설 수: (역, 유형, 반경 구간) 키 하나로 bincount → 반경 방향 누적
+    if category is not None:
+        codes, cats = pd.factorize(facilities.points[category], sort=True)
+        nc = len(cats)
+        code = codes[hit]
+        ok = inside & (code >= 0)
+        by_cat = np.bincount((owner[ok] * nc + code[ok]) * nr + band[ok],
+                             minlength=q * nc * nr).reshape(q, nc, nr).cumsum(axis=2)
+        out = pd.concat([out, pd.DataFrame(
+            {f"{c}_{_radius_label(r)}": by_cat[:, a, k] for k, r in enumerate(radii) for a, c in enumerate(cats)},
+            index=out.index)], axis=1)
+
+    # 3) 반경 안 가까운 순 최대 n곳 이름 (정렬된 배열에서 역 안 순번으로 자름)
+    if caps:
+        order_in_station = np.arange(len(d)) - start[owner]
+        names = facilities.points[name].astype(str).to_numpy()
+        for r, n in caps:
+            pick = d <= r if n is None else (order_in_station < n) & (d <= r)
+            joined = pd.Series(names[hit[pick]]).groupby(owner[pick], sort=True).agg(", ".join)
+            label = "전체" if n is None else f"최대{n}개"
+            out[f"시설_{_radius_label(r)}_{label}"] = joined.reindex(range(q), fill_value="").to_numpy()
+    return out
@@ -5,6 +5,8 @@ import folium
 from folium.features import DivIcon
 from branca.colormap import LinearColormap
 
+from 인코딩감지 import read_csv_auto
+
 # ----------------------------------
 # 1) 입력 경로
 # ----------------------------------
@@ -16,13 +18,7 @@ seoul_geojson_path = "/Users/jihye/Documents/하이태커코드정리/seoul_gu_b
 # ----------------------------------
 # 2) 데이터 로드 & 자치구 점수 집계
 # ----------------------------------
-def read_csv_smart(p):
-    try:
-        return pd.read_csv(p, encoding="utf-8")
-    except UnicodeDecodeError:
-        return pd.read_csv(p, encoding="cp949")
-
-df = read_csv_smart(station_csv)
+df = read_csv_auto(station_csv)
 
 # 컬럼 자동 인식
 def pick(cols, cands):
@@ -1,5 +1,7 @@
-import requests
 import pandas as pd
+import pyarrow as pa
+
+from odcloud_수집 import PageCache, fetch_rows, write_pages
 
 # 1) 본인 서비스키 (이미 인코딩된 키여도 params에 그대로 넣어도 됩니다. 절대 다시 인코딩하지 마세요)
 SERVICE_KEY = "Your Service Key"
@@ -12,12 +14,21 @@ UDDI_MAP = {
 
 BASE = "https://api.odcloud.kr/api/15113638/v1"
 
-def fetch_od(date_key: str, per_page: int = 1000, max_pages: int | None = None) -> pd.DataFrame:
+
+def column_type(name: str):
+    """저장 타입: 승객수 컬럼(경로_승객수, 총_승객수 …)은 정수, 나머지(기준일자/역/호선)는 문자열"""
+    return pa.int64() if name.endswith("_승객수") else None
+
+
+def fetch_od(date_key: str, per_page: int = 1000, max_pages: int | None = None,
+             workers: int = 8, use_cache: bool = True) -> pd.DataFrame:
     """
     서울특별시_지하철 역별 OD 데이터 수집
     - date_key: '20221231' 또는 '20231231'
     - per_page: 페이지당 행 수 (최대치는 API 정책에 따름, 1000 권장)
     - max_pages: 가져올 최대 페이지 수 (None이면 끝까지)
+    - workers: 동시에 요청할 페이지 수 (keep-alive 세션 재사용, 일시 오류는 재시도)
+    - use_cache: 받은 페이지를 odcloud_캐시/에 저장 → 끊겨도 이어받기, 다 받은 스냅샷은 요청 없이 재사용
     """
     if date_key not in UDDI_MAP:
         raise ValueError(f"date_key는 {list(UDDI_MAP.keys())} 중 하나여야 합니다.")
@@ -25,57 +36,39 @@ def fetch_od(date_key: str, per_page: int = 1000, max_pages: int | None = None)
     resource = UDDI_MAP[date_key]
     url = f"{BASE}/{resource}"
 
-    page = 1
-    all_rows = []
-
-    while True:
-        params = {
-            "serviceKey": SERVICE_KEY,
-            "page": page,
-            "perPage": per_page,
-            # "returnType": "JSON",  # 기본이 JSON이라 주석
-            # 조건이 필요하면 cond[컬럼명] 사용 (예: 기준일자 필터)
-            # "cond[기준일자]": "20231231",
-        }
-
-        resp = requests.get(url, params=params, timeout=30)
-        if resp.status_code != 200:
-            raise RuntimeError(f"[HTTP {resp.status_code}] {resp.text[:500]}")
-
-        try:
-            payload = resp.json()
-        except Exception:
-            raise RuntimeError("JSON 파싱 실패:\n" + resp.text[:500])
-
-        data = payload.get("data", [])
-        current = payload.get("currentCount", 0)
-
-        if not data or current == 0:
-            break
-
-        all_rows.extend(data)
-
-        # 페이지 제한에 도달했으면 중단
-        if max_pages is not None and page >= max_pages:
-            break
-
-        # 다음 페이지로
-        page += 1
+    # 조건이 필요하면 cond[컬럼명] 사용 (예: extra_params={"cond[기준일자]": "20231231"})
+    all_rows = fetch_rows(url, SERVICE_KEY, per_page=per_page, max_pages=max_pages, workers=workers,
+                          cache=PageCache() if use_cache else None)
 
     # DataFrame으로 변환
     df = pd.DataFrame(all_rows)
     return df
 
 
+def save_od(date_key: str, out_path, per_page: int = 1000, max_pages: int | None = None,
+            workers: int = 8, use_cache: bool = True) -> int:
+    """
+    fetch_od와 같은 데이터를 메모리에 모으지 않고 페이지 단위로 바로 파일에 저장 (.csv / .parquet)
+    - 인원수 컬럼은 정수, 나머지는 문자열로 저장 (column_type)
+    반환: 저장한 행 수
+    """
+    if date_key not in UDDI_MAP:
+        raise ValueError(f"date_key는 {list(UDDI_MAP.keys())} 중 하나여야 합니다.")
+
+    url = f"{BASE}/{UDDI_MAP[date_key]}"
+    return write_pages(url, SERVICE_KEY, out_path, per_page=per_page, max_pages=max_pages,
+                       workers=workers, types=column_type, cache=PageCache() if use_cache else None)
+
+
 if __name__ == "__main__":
     # 예시: 2023-12-31 데이터 전부 가져오기
-    df = fetch_od("20221231", per_page=1000, max_pages=None)
+    # CSV 저장 (원하는 경로로 변경, .parquet 도 가능)
+    out_path = "/Users/jihye/Documents/지하철_OD_20221231.csv"
 
-    # 미리보기
-    print("rows:", len(df))
-    print(df.head(5))
+    # 페이지 단위로 바로 저장 (전체를 DataFrame으로 모으지 않음)
+    rows = save_od("20221231", out_path, per_page=1000, max_pages=None)
 
-    # CSV 저장 (원하는 경로로 변경)
-    out_path = "/Users/jihye/Documents/지하철_OD_20221231.csv"
-    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    # 미리보기
+    print("rows:", rows)
+    print(pd.read_csv(out_path, nrows=5, encoding="utf-8-sig"))
     print(f"Saved: {out_path}")
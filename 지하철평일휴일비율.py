@@ -3,6 +3,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import platform
 
+from 집계_백엔드 import monthly_daytype_sum
+
 # ==============================
 # 0) 한글 폰트 설정
 # ==============================
@@ -16,41 +18,32 @@ else:
 plt.rcParams["axes.unicode_minus"] = False
 
 # ==============================
-# 1) 데이터 로드
+# 1) 설정
 # ==============================
-file_path = "/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/시간대별_월평균_평일휴일_역별_승하차_통합(반올림_행합계포함).csv"
-try:
-    df = pd.read_csv(file_path, encoding="utf-8")
-except UnicodeDecodeError:
-    df = pd.read_csv(file_path, encoding="cp949")
-
-# 분석 기간(2021-07 ~ 2023-12)만 사용하고 싶다면 주석 해제
-# df = df[(df["월"] >= "2021-07") & (df["월"] <= "2023-12")].copy()
+rollup_dir = "/Users/jihye/Documents/하이태커코드정리/서울지하철_노인파일/출력/노인승하차_롤업"
+# 월 × 평일휴일 × 역 × 승하차 단위 롤업 테이블 (시간대 컬럼 = 월평균 하루치, 노인_지하철파일.py에서 생성)
 
-# ==============================
-# 2) 월별 평일/휴일 비율 산출용 전처리
-#    - 이 파일의 시간대 컬럼들은 이미 "월평균 하루치" (역·승/하차별) 값입니다.
-#    - 따라서 월별 '서울시 하루'를 만들려면 역/승하차별 일평균을 합산하면 됩니다.
-# ==============================
-# 시간대 컬럼 목록
-time_cols = [c for c in df.columns if "시간대" in c]
+# 집계 엔진: "pandas"(즉시 실행) 또는 "polars"(지연 실행 + 스트리밍), 결과는 같음
+ENGINE = "pandas"
 
-# 각 행(월·평일/휴일·역·승/하차)의 하루 총합
-df["합계"] = df[time_cols].sum(axis=1)
+# 분석 기간(2021-07 ~ 2023-12)만 사용하고 싶다면 ("2021-07", "2023-12")
+MONTHS = None
 
 # ==============================
-# 3) monthly_ratio 정의
+# 2) monthly_ratio 정의
+#    - 롤업의 시간대 값은 이미 "월평균 하루치" (역·승/하차별) 이므로
+#      역/승하차별 일평균을 모두 합하면 월별 '서울시 하루'
 #    monthly_sum    : 월 x 평일/휴일의 '하루 합계' (역·승/하차를 모두 합한 값)
 #    monthly_ratio  : 각 월에서 평일/휴일이 차지하는 비율(%), 월별로 100% 정규화
 # ==============================
-monthly_sum = df.groupby(["월", "평일휴일"])["합계"].sum().unstack(fill_value=0)
+monthly_sum = monthly_daytype_sum(rollup_dir, engine=ENGINE, months=MONTHS)
 monthly_ratio = monthly_sum.div(monthly_sum.sum(axis=1), axis=0) * 100  # <= ★ 여기서 정의됨
 
 # (선택) CSV로 저장
 # monthly_ratio.to_csv("월별_평일휴일_비율(100퍼센트_정규화).csv", encoding="utf-8-sig")
 
 # ==============================
-# 4) 시각화: 월별 평일/휴일 비율 (누적 막대, 100% 기준)
+# 3) 시각화: 월별 평일/휴일 비율 (누적 막대, 100% 기준)
 #    - 평일: 빨간색, 휴일: 파란색
 #    - 막대 내부에 비율 라벨 표시
 # ==============================
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+집계 파이프라인 실행 엔진 선택 (pandas 즉시 실행 / Polars 지연 실행)
+- 같은 집계를 두 방식으로 구현하고 engine 인자로 고름 → 결과 표는 같은 모양/타입
+  · "pandas": 기존 스크립트와 같은 방식 (파일 전체 로드 → 단계마다 DataFrame)
+  · "polars": scan_parquet / scan_csv 로 질의 계획을 만든 뒤 한 번에 실행
+              (필요한 컬럼만 읽고 필터를 스캔 단계로 내림, 멀티스레드 스트리밍 실행)
+- 결과는 작은 집계표라 마지막에만 pandas로 바꿔서 돌려줌 (그래프/출력 코드는 그대로)
+- compare()로 두 엔진을 나란히 실행해 결과가 같은지와 걸린 시간을 확인
+  예) yearly_window_sum(ROLLUP_DIR, 10, 17, engine="polars")
+      compare(monthly_daytype_sum, ROLLUP_DIR)
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from 승하차_롤업 import grain_name, load_rollup, select_months
+from 승하차_스키마 import read_summary
+from 시간대_누적 import HourPrefix
+from 시간대_컬럼 import hour_columns, resolve_columns, window_columns
+from 인코딩감지 import detect_encoding, read_csv_auto
+
+ENGINES = ("pandas", "polars")
+DAYTYPE = "평일휴일"
+
+
+def _check_engine(engine: str):
+    if engine not in ENGINES:
+        raise ValueError(f"engine은 {ENGINES} 중 하나여야 합니다: {engine}")
+
+
+def _rollup_path(rollup_dir) -> Path:
+    path = Path(rollup_dir) / f"{grain_name('월', DAYTYPE)}.parquet"
+    if not path.exists():
+        raise FileNotFoundError(f"롤업 테이블이 없습니다: {path} (build_rollup을 먼저 실행하세요)")
+    return path
+
+
+def _month_filter(pl, months):
+    """select_months와 같은 규칙의 Polars 조건 (목록 또는 (시작월, 끝월) 포함 구간)"""
+    m = pl.col("월").cast(pl.String)
+    if isinstance(months, tuple) and len(months) == 2:
+        return m.is_between(pl.lit(str(months[0])), pl.lit(str(months[1])), closed="both")
+    return m.is_in([str(x) for x in months])
+
+
+def _load_months(rollup_dir, months) -> pd.DataFrame:
+    df = load_rollup(rollup_dir, "월", DAYTYPE)
+    return df if months is None else select_months(df, months).copy()
+
+
+def _collect(lf):
+    """질의 계획 실행 (스트리밍 엔진) → pandas"""
+    return lf.collect(engine="streaming").to_pandas()
+
+
+def _pivot(long: pd.DataFrame, index: str, value: str) -> pd.DataFrame:
+    """(index, 평일휴일, 값) 긴 표 → index × 평일휴일 (없는 칸 0, 평일/휴일 순서 고정)"""
+    wide = long.pivot_table(index=index, columns=DAYTYPE, values=value, aggfunc="sum",
+                            fill_value=0, observed=True)
+    wide.columns = pd.Index(wide.columns.astype(str), name=DAYTYPE)
+    order = [c for c in ("평일", "휴일") if c in wide.columns]
+    wide = wide[order + [c for c in wide.columns if c not in order]]
+    return wide.sort_index().astype("float64")
+
+
+# ===== 1) 연도 × 평일휴일 시간창 합계 (노인평일휴일.py) =====
+def yearly_window_sum(rollup_dir, start: int, end: int, engine: str = "pandas", months=None) -> pd.DataFrame:
+    """
+    월 롤업 → 연도 × 평일휴일 별 [start, end) 시간창 합계 (월평균 하루치의 합)
+    - months: 분석 기간 제한 (['2023-01', ...] 목록 또는 ('2021-07', '2023-12') 구간)
+    """
+    _check_engine(engine)
+    if engine == "pandas":
+        df = _load_months(rollup_dir, months)
+        df["합계"] = HourPrefix.from_table(df).window(start, end)
+        df["연도"] = pd.to_numeric(df["월"].astype(str).str.extract(r"^(\d{4})")[0], errors="coerce")
+        df = df.dropna(subset=["연도"])
+        df["연도"] = df["연도"].astype("int64")
+        long = df.groupby(["연도", DAYTYPE], observed=True)["합계"].sum().reset_index()
+    else:
+        import polars as pl
+
+        lf = pl.scan_parquet(_rollup_path(rollup_dir))
+        if months is not None:
+            lf = lf.filter(_month_filter(pl, months))
+        cols = window_columns(lf.collect_schema().names(), start, end)
+        if not cols:
+            raise ValueError(f"{start}~{end}시 구간에 해당하는 시간대 컬럼을 찾지 못했습니다. 컬럼명을 확인해 주세요.")
+        long = _collect(
+            lf.select(
+                pl.col("월").cast(pl.String).str.slice(0, 4).cast(pl.Int64, strict=False).alias("연도"),
+                pl.col(DAYTYPE).cast(pl.String),
+                pl.sum_horizontal(pl.col(cols).cast(pl.Float64).fill_null(0)).alias("합계"),
+            )
+            .drop_nulls("연도")
+            .group_by("연도", DAYTYPE)
+            .agg(pl.col("합계").sum())
+        )
+    return _pivot(long, "연도", "합계")
+
+
+# ===== 2) 월 × 평일휴일 하루 합계 (지하철평일휴일비율.py) =====
+def monthly_daytype_sum(rollup_dir, engine: str = "pandas", months=None) -> pd.DataFrame:
+    """월 롤업 → 월 × 평일휴일 별 하루 합계 (모든 역·승하차 합, months는 yearly_window_sum과 같음)"""
+    _check_engine(engine)
+    if engine == "pandas":
+        df = _load_months(rollup_dir, months)
+        df["합계"] = df[hour_columns(df.columns)].sum(axis=1)
+        long = df.groupby(["월", DAYTYPE], observed=True)["합계"].sum().reset_index()
+        long["월"] = long["월"].astype(str)
+    else:
+        import polars as pl
+
+        lf = pl.scan_parquet(_rollup_path(rollup_dir))
+        if months is not None:
+            lf = lf.filter(_month_filter(pl, months))
+        cols = hour_columns(lf.collect_schema().names())
+        long = _collect(
+            lf.select(
+                pl.col("월").cast(pl.String),
+                pl.col(DAYTYPE).cast(pl.String),
+                pl.sum_horizontal(pl.col(cols).cast(pl.Float64).fill_null(0)).alias("합계"),
+            )
+            .group_by("월", DAYTYPE)
+            .agg(pl.col("합계").sum())
+        )
+    return _pivot(long, "월", "합계")
+
+
+# ===== 3) 평일 월별 서울시 하루 (시간대별분석.py) =====
+def _scan_summary(path):
+    """요약 CSV → LazyFrame (헤더는 표준 시간대 이름으로, utf-8이 아니면 read_csv_auto 결과를 지연 프레임으로)"""
+    import polars as pl
+
+    if detect_encoding(path) in ("utf-8", "utf-8-sig"):
+        lf = pl.scan_csv(path, infer_schema=False)   # 모두 문자열로 읽고 필요한 컬럼만 변환
+    else:
+        lf = pl.from_pandas(read_csv_auto(path, dtype=str)).lazy()
+    rename = {k: v for k, v in resolve_columns(lf.collect_schema().names()).rename.items() if k != v}
+    return lf.rename(rename) if rename else lf
+
+
+def weekday_monthly_profile(summary_csv, engine: str = "pandas") -> pd.DataFrame:
+    """월별 요약 → 평일만, 월 × 시간대 합계 (역·승하차를 모두 합친 '그 달의 하루', 시간대는 시작 시각 순)"""
+    _check_engine(engine)
+    if engine == "pandas":
+        df = read_summary(summary_csv)
+        if DAYTYPE not in df.columns or "월" not in df.columns:
+            raise ValueError("데이터에 '평일휴일' 또는 '월' 컬럼이 없습니다.")
+        weekday = df[df[DAYTYPE] == "평일"]
+        cols = hour_columns(weekday.columns)
+        out = weekday.groupby("월", observed=True)[cols].sum()
+        out.index = out.index.astype(str)
+    else:
+        import polars as pl
+
+        lf = _scan_summary(summary_csv)
+        names = lf.collect_schema().names()
+        if DAYTYPE not in names or "월" not in names:
+            raise ValueError("데이터에 '평일휴일' 또는 '월' 컬럼이 없습니다.")
+        cols = hour_columns(names)
+        # read_summary와 같은 규칙: 숫자화 → 반올림 → 정수, 결측은 합계에서 제외
+        counts = [pl.col(c).str.strip_chars().cast(pl.Float64, strict=False).round(0).cast(pl.Int64) for c in cols]
+        out = _collect(
+            lf.filter(pl.col(DAYTYPE).str.strip_chars() == "평일")
+            .select(pl.col("월").cast(pl.String), *counts)
+            .group_by("월")
+            .agg(pl.col(cols).sum())
+        ).set_index("월")
+    if not cols:
+        raise ValueError("시간대 컬럼이 존재하지 않습니다. 입력 데이터를 확인하세요.")
+    out = out[cols].astype("int64").sort_index()
+    out.index.name = "월"
+    return out
+
+
+# ===== 4) 두 엔진 비교 =====
+def compare(func, *args, rtol: float = 1e-9, **kwargs) -> dict:
+    """
+    같은 파이프라인을 두 엔진으로 실행 → {엔진: 걸린 시간(초)}
+    - 결과 표가 다르면 AssertionError (실수 합계는 더하는 순서 차이만큼의 rtol 허용, 정수는 완전히 같아야 함)
+    """
+    results, seconds = {}, {}
+    for engine in ENGINES:
+        t0 = time.perf_counter()
+        results[engine] = func(*args, engine=engine, **kwargs)
+        seconds[engine] = time.perf_counter() - t0
+    pd.testing.assert_frame_equal(results["pandas"], results["polars"], check_exact=False, rtol=rtol)
+    return seconds